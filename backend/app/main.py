@@ -1,14 +1,41 @@
+import io
 import os
-import base64
+import asyncio
+import time
 import numpy as np
-from pathlib import Path
+from PIL import Image
 
 from fastapi import FastAPI, File, UploadFile, Form, Request
-from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from backend.app.services import inference as aurora_inference
-from backend.app.utils.temp_paths import make_temp_file, cleanup_paths, temp_dir
+from backend.app.services import bg_providers, metrics, profiling, warmup
+from backend.app.services.model_registry import registry as model_registry
+from backend.app.services.jobs import SUCCEEDED, JobStoreFullError, job_store
+from backend.app.services.cache import content_hash
+from backend.app.services.encoding import (
+    DEFAULT_COMPRESSION,
+    DEFAULT_FORMAT,
+    EXTENSIONS,
+    MEDIA_TYPES,
+    negotiate_format,
+    normalize_format,
+    resolve_format,
+    save_options,
+    stream_encoded,
+)
+from backend.app.services.result_cache import get_result, output_key, put_result, result_cache, result_key
+from backend.app.services.result_store import result_store
+from backend.app.services.singleflight import SingleFlight
+from backend.app.services.workers import (
+    GENERATION_LANE,
+    SEGMENTATION_LANE,
+    UPSCALE_LANE,
+    QueueFullError,
+    inference_pool,
+)
+from backend.app.utils.aurora_utils import replace_background
 
 app = FastAPI(
     title="Aurora AI",
@@ -26,8 +53,13 @@ app.add_middleware(
 )
 
 @app.on_event("startup")
-async def load_model_on_startup() -> None:
-    aurora_inference.get_model(None)
+async def start_background_warmup() -> None:
+    warmup.start_warmup()
+    bg_providers.start_prewarm_from_env()
+
+@app.on_event("shutdown")
+async def stop_workers() -> None:
+    inference_pool.shutdown()
 
 HTML_FORM = """
 <!DOCTYPE html>
@@ -184,6 +216,77 @@ HTML_FORM = """
 async def health_check():
     return {"status": "healthy", "timestamp": "2026-01-02"}
 
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    status = warmup.readiness()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
+
+@app.get("/api/queue")
+async def queue_status() -> JSONResponse:
+    inference = warmup.loaded_inference()
+    return JSONResponse(content={
+        "lanes": inference_pool.stats(),
+        "segmentationBatching": inference.segmentation_batch_stats() if inference else None,
+        "resultCache": result_cache.stats(),
+        "resultStore": result_store.stats(),
+        "coalescing": {"process": _process_flight.stats(), "background": bg_providers.coalescing_stats()},
+        "maskCache": inference.mask_cache_stats() if inference else None,
+        "backgroundCache": bg_providers.background_cache_stats(),
+    })
+
+def _service_metrics():
+    queue_depth = metrics.Gauge("aurora_queue_depth", "Requests waiting for a worker", ("lane",))
+    queue_running = metrics.Gauge("aurora_queue_running", "Requests running on a worker", ("lane",))
+    queue_rejected = metrics.Counter("aurora_queue_rejected_total", "Requests rejected with 503", ("lane",))
+    for lane, stats in inference_pool.stats().items():
+        queue_depth.set(stats["queued"], lane=lane)
+        queue_running.set(stats["running"], lane=lane)
+        queue_rejected.set(stats["rejected"], lane=lane)
+
+    cache_hits = metrics.Counter("aurora_cache_hits_total", "Cache hits", ("cache",))
+    cache_misses = metrics.Counter("aurora_cache_misses_total", "Cache misses", ("cache",))
+    cache_hit_ratio = metrics.Gauge("aurora_cache_hit_ratio", "Cache hit rate since startup", ("cache",))
+    cache_bytes = metrics.Gauge("aurora_cache_bytes", "Bytes held in memory by each cache", ("cache",))
+    inference = warmup.loaded_inference()
+    caches = {
+        "result": result_cache.stats(),
+        "mask": inference.mask_cache_stats() if inference else None,
+        "background": bg_providers.background_cache_stats(),
+    }
+    for cache, stats in caches.items():
+        if stats is None:
+            continue
+        cache_hits.set(stats["hits"], cache=cache)
+        cache_misses.set(stats["misses"], cache=cache)
+        cache_hit_ratio.set(stats["hitRate"], cache=cache)
+        cache_bytes.set(stats["bytes"], cache=cache)
+
+    model_loaded = metrics.Gauge("aurora_model_loaded", "Whether the model is currently loaded", ("model",))
+    model_bytes = metrics.Gauge("aurora_model_bytes", "Approximate memory used by the model", ("model",))
+    model_loads = metrics.Counter("aurora_model_loads_total", "Model loads, including reloads after eviction", ("model",))
+    for model, stats in model_registry.stats()["models"].items():
+        model_loaded.set(int(stats["loaded"]), model=model)
+        model_bytes.set(stats["approxBytes"], model=model)
+        model_loads.set(stats["loads"], model=model)
+
+    return [
+        queue_depth, queue_running, queue_rejected,
+        cache_hits, cache_misses, cache_hit_ratio, cache_bytes,
+        model_loaded, model_bytes, model_loads,
+    ]
+
+
+metrics.register_collector(_service_metrics)
+
+
+@app.get("/metrics")
+async def metrics_endpoint() -> Response:
+    return Response(content=await run_in_threadpool(metrics.render), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/models")
+async def model_status() -> JSONResponse:
+    return JSONResponse(content=model_registry.stats())
+
 @app.get("/", response_class=HTMLResponse)
 async def index() -> HTMLResponse:
     return HTMLResponse(content=HTML_FORM)
@@ -247,120 +350,376 @@ async def debug_openvino() -> JSONResponse:
         result["provider"] = "lcm"
         return JSONResponse(content=result)
 
-@app.post("/process")
-async def process_image(
-    request: Request,
-    image: UploadFile = File(...),
-    mode: str = Form("remove_background"),
-    background: UploadFile | None = File(None),
-    bg_type: str = Form("upload"),
-    bg_prompt: str = Form(""),
-    bg_quality: str = Form("fast"),
-    bg_provider: str = Form("lcm"),
+@metrics.timed("decode")
+def _decode_image(contents: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(contents))
+    image.load()
+    return image
+
+
+@metrics.timed("compositing")
+def _composite_generated(input_image: Image.Image, generated_bg: Image.Image) -> Image.Image:
+    # Coalesced generations hand the same image to every caller, so each one
+    # gets its own copy to encode.
+    has_alpha = input_image.mode in ('RGBA', 'LA') or 'transparency' in input_image.info
+    
+    if has_alpha:
+        if input_image.mode != 'RGBA':
+            input_image = input_image.convert('RGBA')
+        
+        alpha_array = np.array(input_image.split()[3])
+        if np.any(alpha_array < 255):
+            print("Compositing using existing alpha (no background removal)...")
+            return replace_background(input_image, generated_bg)
+        
+        print("Input has alpha but is fully opaque, using generated background...")
+        return generated_bg.copy()
+    
+    print("Input has no transparency, returning generated background only (no ML removal)...")
+    return generated_bg.copy()
+
+
+def _provider_headers(provider_notice: str | None, provider_info: dict | None) -> dict:
+    headers = {}
+    if provider_notice:
+        headers["X-Aurora-Notice"] = provider_notice
+    if provider_info:
+        headers["X-Aurora-Provider"] = provider_info.get("provider", "unknown")
+        headers["X-Aurora-Elapsed"] = str(provider_info.get("elapsedSeconds", 0))
+        headers["X-Aurora-ETA"] = provider_info.get("etaText", "")
+        if "cached" in provider_info:
+            headers["X-Aurora-Background-Cache"] = "hit" if provider_info["cached"] else "miss"
+    return headers
+
+
+def _lane_for_mode(mode: str) -> str:
+    return SEGMENTATION_LANE if mode == "remove_background" else UPSCALE_LANE
+
+
+class BackgroundGenerationError(RuntimeError):
+    pass
+
+
+def _run_pipeline(
+    contents: bytes,
+    mode: str,
+    bg_contents: bytes | None,
+    progress_callback=None,
+    seg_quality: str | None = None,
+) -> Image.Image:
+    input_image = _decode_image(contents)
+    background_image = _decode_image(bg_contents) if bg_contents else None
+    
+    print(f"Processing upload ({mode}, {input_image.size[0]}x{input_image.size[1]})")
+    return warmup.import_inference().run_pipeline(
+        input_image,
+        mode=mode,
+        background=background_image,
+        progress_callback=progress_callback,
+        seg_quality=seg_quality or None,
+    )
+
+
+@metrics.timed("generation")
+def _generate_background(**kwargs):
+    return warmup.import_inference().generate_background(**kwargs)
+
+
+async def _execute(
+    contents: bytes,
+    mode: str,
+    bg_type: str,
+    bg_contents: bytes | None,
+    bg_prompt: str,
+    bg_quality: str,
+    bg_provider: str,
+    bg_seed: int | None = None,
+    progress_callback=None,
+    seg_quality: str | None = None,
 ):
-    temp_files: list[Path] = []
+    def report(stage: str, fraction: float) -> None:
+        if progress_callback is not None:
+            progress_callback(stage, fraction)
     
-    try:
-        print(f"Temp files created in: {temp_dir()}")
+    if bg_type == "generate" and bg_prompt and bg_prompt.strip():
+        provider_pref = bg_provider.lower() if bg_provider else "lcm"
+        if provider_pref not in ("auto", "openvino", "lcm"):
+            provider_pref = "lcm"
         
-        suffix = os.path.splitext(image.filename or "")[1] or ".png"
-        in_path = make_temp_file(suffix=suffix)
-        temp_files.append(in_path)
-        contents = await image.read()
-        in_path.write_bytes(contents)
-
-        bg_path: Path | None = None
-        provider_notice: str | None = None
-        provider_info: dict | None = None
-        if bg_type == "upload" and background is not None:
-            bg_contents = await background.read()
-            if bg_contents:
-                bg_suffix = os.path.splitext(background.filename or "")[1] or ".png"
-                bg_path = make_temp_file(suffix=bg_suffix)
-                temp_files.append(bg_path)
-                bg_path.write_bytes(bg_contents)
-        elif bg_type == "generate" and bg_prompt and bg_prompt.strip():
+        print(f"Background generation requested with provider preference: {provider_pref}")
+        try:
+            report("generation", 0.0)
+            generated_bg, provider_info = await inference_pool.run(
+                GENERATION_LANE,
+                profiling.call,
+                _generate_background,
+                prompt=bg_prompt.strip(),
+                quality=bg_quality,
+                provider_pref=provider_pref,
+                seed=bg_seed,
+            )
+            report("compositing", 0.0)
+            input_image = await run_in_threadpool(profiling.call, _decode_image, contents)
+            result = await run_in_threadpool(profiling.call, _composite_generated, input_image, generated_bg)
+        except QueueFullError:
+            raise
+        except Exception as e:
+            raise BackgroundGenerationError(str(e)) from e
+        return result, provider_info.get("message"), provider_info
+    
+    if bg_type != "upload":
+        bg_contents = None
+    
+    result = await inference_pool.run(
+        _lane_for_mode(mode), profiling.call, _run_pipeline, contents, mode, bg_contents, progress_callback, seg_quality
+    )
+    return result, None, None
+
+
+class _Output:
+    def __init__(
+        self,
+        headers: dict,
+        provider_info: dict | None,
+        output_format: str,
+        compression: str | None,
+        payload: bytes | None = None,
+        image: Image.Image | None = None,
+        cache_key: str | None = None,
+        meta: dict | None = None,
+        timer: metrics.RequestTimer | None = None,
+        mode: str = "",
+    ) -> None:
+        self.headers = headers
+        self.provider_info = provider_info
+        self.format = output_format
+        self.compression = compression
+        self.payload = payload
+        self.image = image
+        self.cache_key = cache_key
+        self.meta = meta
+        self.timer = timer
+        self.mode = mode
+        self.profile: profiling.ProfileSession | None = None
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+    def server_timing(self) -> str:
+        return self.timer.server_timing(include_total=self.payload is not None)
+
+    def _finish_profile(self, status: str = "ok") -> None:
+        if self.profile is not None:
+            profiling.finish(
+                self.profile,
+                mode=self.mode,
+                status=status,
+                cache=self.headers.get("X-Aurora-Cache"),
+                format=self.format,
+                serverTiming=self.timer.server_timing() if self.timer is not None else None,
+            )
+
+    async def chunks(self):
+        if self.payload is not None:
             try:
-                provider_pref = bg_provider.lower() if bg_provider else "lcm"
-                if provider_pref not in ("auto", "openvino", "lcm"):
-                    provider_pref = "lcm"
-                
-                print(f"Background generation requested with provider preference: {provider_pref}")
-                generated_bg, provider_info_result = aurora_inference.generate_background(
-                    prompt=bg_prompt.strip(),
-                    quality=bg_quality,
-                    provider_pref=provider_pref,
-                )
-                provider_info = provider_info_result
-                provider_notice = provider_info.get("message")
-                
-                bg_path = make_temp_file(suffix=".png")
-                temp_files.append(bg_path)
-                generated_bg.save(bg_path, format="PNG")
-                print(f"Generated background saved to: {bg_path}")
-                
-                out_path = make_temp_file(suffix=".png")
-                temp_files.append(out_path)
-                
-                print(f"Input image path: {in_path}")
-                print(f"Background path: {bg_path}")
-                print(f"Output composite path: {out_path}")
-                
-                from PIL import Image
-                from backend.app.utils.aurora_utils import replace_background
-                
-                input_image = Image.open(in_path)
-                has_alpha = input_image.mode in ('RGBA', 'LA') or 'transparency' in input_image.info
-                
-                if has_alpha:
-                    if input_image.mode != 'RGBA':
-                        input_image = input_image.convert('RGBA')
-                    
-                    alpha_channel = input_image.split()[3]
-                    alpha_array = np.array(alpha_channel)
-                    has_transparency = np.any(alpha_array < 255)
-                    
-                    if has_transparency:
-                        print("Compositing using existing alpha (no background removal)...")
-                        composite = replace_background(input_image, str(bg_path))
-                        composite.save(out_path, format="PNG")
-                        print(f"✓ Saved composite image to: {out_path}")
-                    else:
-                        print("Input has alpha but is fully opaque, using generated background...")
-                        generated_bg = Image.open(bg_path)
-                        generated_bg.save(out_path, format="PNG")
-                        print(f"✓ Saved background image to: {out_path}")
-                else:
-                    print("Input has no transparency, returning generated background only (no ML removal)...")
-                    generated_bg = Image.open(bg_path)
-                    generated_bg.save(out_path, format="PNG")
-                    print(f"✓ Saved background image to: {out_path}")
-                
-                with out_path.open("rb") as f:
-                    image_bytes = f.read()
-                
-                base_name = os.path.splitext(image.filename or "output")[0]
-                out_filename = f"{base_name}_aurora.png"
-                
-                accept_header = request.headers.get("accept", "")
-                if "image/png" in accept_header or "image/*" in accept_header or "*/*" in accept_header:
-                    headers = {}
-                    if provider_notice:
-                        headers["X-Aurora-Notice"] = provider_notice
-                    if provider_info:
-                        headers["X-Aurora-Provider"] = provider_info.get("provider", "unknown")
-                        headers["X-Aurora-Elapsed"] = str(provider_info.get("elapsedSeconds", 0))
-                        headers["X-Aurora-ETA"] = provider_info.get("etaText", "")
-                    return Response(
-                        content=image_bytes,
-                        media_type="image/png",
-                        headers=headers if headers else None
-                    )
-                
-                b64_image = base64.b64encode(image_bytes).decode("ascii")
-                data_url = f"data:image/png;base64,{b64_image}"
-                
-                result_html = f"""
+                yield self.payload
+            finally:
+                self._finish_profile()
+            return
+        
+        collected = []
+        collected_bytes = 0
+        cacheable = self.cache_key is not None
+        start = time.perf_counter()
+        try:
+            async for chunk in stream_encoded(self.image, self.format, self.compression):
+                if cacheable:
+                    collected.append(chunk)
+                    collected_bytes += len(chunk)
+                    if collected_bytes > result_cache.max_item_bytes:
+                        cacheable = False
+                        collected.clear()
+                yield chunk
+        finally:
+            seconds = time.perf_counter() - start
+            if self.profile is not None:
+                self.profile.mark("encode", start, seconds)
+            if self.timer is not None:
+                self.timer.add("encode", seconds)
+                metrics.observe_request(self.timer, self.mode, (self.provider_info or {}).get("provider"), "miss")
+            self._finish_profile()
+        
+        if cacheable:
+            put_result(self.cache_key, b"".join(collected), self.meta)
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.chunks()])
+
+
+class _OutputResponse(StreamingResponse):
+    def __init__(self, output: _Output, headers: dict) -> None:
+        super().__init__(output.chunks(), media_type=output.media_type, headers=headers)
+        self.output = output
+
+    async def __call__(self, scope, receive, send) -> None:
+        # A client that disconnects before the body starts never runs the
+        # generator's cleanup, so make sure its profile is finished anyway.
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.output._finish_profile(status="disconnected")
+
+
+def _background_key(
+    bg_type: str,
+    bg_contents: bytes | None,
+    bg_prompt: str,
+    bg_quality: str,
+    bg_provider: str,
+    bg_seed: int | None,
+) -> str | None:
+    if bg_type == "generate" and bg_prompt and bg_prompt.strip():
+        prompt = bg_providers.normalize_prompt(bg_prompt)
+        return f"prompt:{prompt}|{bg_quality}|{bg_providers.resolve_provider(bg_provider)}|{bg_seed}"
+    if bg_type == "upload" and bg_contents:
+        return f"upload:{content_hash(bg_contents)}"
+    return None
+
+
+def _result_key(
+    contents: bytes,
+    mode: str,
+    background_key: str | None,
+    seg_quality: str | None,
+) -> str:
+    if seg_quality:
+        mode = f"{mode}|seg={seg_quality.strip().lower()}"
+    return result_key(contents, mode, background_key, warmup.import_inference().model_version())
+
+
+_process_flight = SingleFlight("process")
+
+
+async def _produce(
+    contents: bytes,
+    mode: str,
+    bg_type: str,
+    bg_contents: bytes | None,
+    bg_prompt: str,
+    bg_quality: str,
+    bg_provider: str,
+    bg_seed: int | None = None,
+    progress_callback=None,
+    seg_quality: str | None = None,
+    output_format: str = DEFAULT_FORMAT,
+    compression: str | None = None,
+) -> _Output:
+    timer = metrics.start_request()
+    compression = (compression or DEFAULT_COMPRESSION).strip().lower()
+    background_key = await run_in_threadpool(
+        _background_key, bg_type, bg_contents, bg_prompt, bg_quality, bg_provider, bg_seed
+    )
+    work_key = await run_in_threadpool(_result_key, contents, mode, background_key, seg_quality)
+    variant = f"{output_format}:{compression}"
+    key = output_key(work_key, variant)
+    
+    cached = get_result(key)
+    if cached is not None:
+        payload, meta = cached
+        headers = _provider_headers(meta.get("notice"), meta.get("provider"))
+        headers["X-Aurora-Cache"] = "hit"
+        if meta.get("backend"):
+            headers["X-Aurora-Backend"] = meta["backend"]
+        metrics.observe_request(timer, mode, (meta.get("provider") or {}).get("provider"), "hit")
+        return _Output(
+            headers, meta.get("provider"), meta.get("format", output_format), compression, payload=payload,
+            timer=timer, mode=mode,
+        )
+    
+    wait_start = time.perf_counter()
+    (result, provider_notice, provider_info), coalesced = await _process_flight.run(
+        work_key,
+        lambda: _execute(
+            contents, mode, bg_type, bg_contents, bg_prompt, bg_quality, bg_provider, bg_seed,
+            progress_callback=progress_callback,
+            seg_quality=seg_quality,
+        ),
+    )
+    if coalesced:
+        timer.add("coalesced", time.perf_counter() - wait_start)
+        print(f"Shared the result of an identical in-flight {mode} request")
+        # Encoding writes to the image (encoderinfo), so a waiter must not
+        # encode the leader's object while the leader is encoding it too.
+        result = await run_in_threadpool(result.copy)
+    actual_provider = (provider_info or {}).get("provider")
+    if background_key and actual_provider and actual_provider != bg_providers.resolve_provider(bg_provider):
+        # A fallback result belongs to the provider that produced it, so the
+        # requested provider's own output can still be cached once it works.
+        background_key = await run_in_threadpool(
+            _background_key, bg_type, bg_contents, bg_prompt, bg_quality, actual_provider, bg_seed
+        )
+        fallback_key = await run_in_threadpool(_result_key, contents, mode, background_key, seg_quality)
+        key = output_key(fallback_key, variant)
+    if progress_callback is not None:
+        progress_callback("encoding", 0.0)
+    backend = None if provider_info else warmup.import_inference().execution_backends(mode)
+    output_format = await run_in_threadpool(resolve_format, result, output_format)
+    
+    headers = _provider_headers(provider_notice, provider_info)
+    headers["X-Aurora-Cache"] = "miss"
+    if coalesced:
+        headers["X-Aurora-Coalesced"] = "1"
+    if backend:
+        headers["X-Aurora-Backend"] = backend
+    meta = {"notice": provider_notice, "provider": provider_info, "backend": backend, "format": output_format}
+    return _Output(
+        headers, provider_info, output_format, compression, image=result, cache_key=key, meta=meta,
+        timer=timer, mode=mode,
+    )
+
+
+def _start_profile(flag: str | None, mode: str) -> tuple[profiling.ProfileSession | None, str | None]:
+    if not flag or flag.strip().lower() in ("0", "false", "no", "off"):
+        return None, None
+    if not profiling.ENABLED:
+        return None, "disabled"
+    session = profiling.start(f"/process {mode}")
+    if session is None:
+        return None, "busy"
+    return session, session.url
+
+
+def _busy_response(exc: QueueFullError) -> JSONResponse:
+    return JSONResponse(
+        content={"error": str(exc), "lane": exc.lane, "queueDepth": exc.depth},
+        status_code=503,
+        headers={"Retry-After": "5"},
+    )
+
+
+def _output_filename(filename: str | None, output_format: str) -> str:
+    base_name = os.path.splitext(filename or "output")[0].replace('"', "")
+    return f"{base_name}_aurora{EXTENSIONS[output_format]}"
+
+
+def _validate_output(output_format: str | None, compression: str | None) -> None:
+    save_options(normalize_format(output_format) or DEFAULT_FORMAT, compression)
+
+
+async def _result_response(output: _Output, filename: str | None, inline_html: bool):
+    if not inline_html:
+        headers = {**output.headers, "Server-Timing": output.server_timing()}
+        if output.payload is not None:
+            headers["Content-Length"] = str(len(output.payload))
+        return _OutputResponse(output, headers)
+    
+    out_filename = _output_filename(filename, output.format)
+    result_id = result_store.put(await output.read(), output.media_type, out_filename, output.headers)
+    result_url = f"/results/{result_id}"
+    headers = {**output.headers, "X-Aurora-Result-Url": result_url, "Server-Timing": output.timer.server_timing()}
+    
+    result_html = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -378,26 +737,19 @@ async def process_image(
   <h1>Aurora AI - Result</h1>
   <div class="actions">
     <a class="btn" href="/"">Process another image</a>
-    <a class="btn" href="{data_url}" download="{out_filename}">Download PNG</a>
+    <a class="btn" href="{result_url}?download=1" download="{out_filename}">Download {output.format.upper()}</a>
   </div>
   <div>
-    <img src="{data_url}" alt="Processed result" />
+    <img src="{result_url}" alt="Processed result" />
   </div>
 </body>
 </html>
 """
-                headers = {}
-                if provider_notice:
-                    headers["X-Aurora-Notice"] = provider_notice
-                if provider_info:
-                    headers["X-Aurora-Provider"] = provider_info.get("provider", "unknown")
-                    headers["X-Aurora-Elapsed"] = str(provider_info.get("elapsedSeconds", 0))
-                    headers["X-Aurora-ETA"] = provider_info.get("etaText", "")
-                
-                return HTMLResponse(content=result_html, headers=headers if headers else None)
-                
-            except Exception as e:
-                error_html = f"""
+    return HTMLResponse(content=result_html, headers=headers)
+
+
+def _error_response(title: str, message: str, status_code: int = 400) -> HTMLResponse:
+    error_html = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -414,115 +766,202 @@ async def process_image(
 </head>
 <body>
   <div class="card">
-    <h1>Background generation error</h1>
-    <p>{str(e)}</p>
+    <h1>{title}</h1>
+    <p>{message}</p>
     <a class="btn" href="/">Back to form</a>
   </div>
 </body>
 </html>
 """
-                return HTMLResponse(content=error_html, status_code=400)
+    return HTMLResponse(content=error_html, status_code=status_code)
 
-        out_path = make_temp_file(suffix=".png")
-        temp_files.append(out_path)
 
-        print(f"Input image path: {in_path}")
-        if bg_path:
-            print(f"Background path: {bg_path}")
-        print(f"Output composite path: {out_path}")
+def _validate_seg_quality(seg_quality: str) -> None:
+    if seg_quality and seg_quality.strip():
+        warmup.import_inference().segmentation_resolution((1, 1), seg_quality)
 
-        aurora_inference.process_image(
-            input_path=str(in_path),
-            output_path=str(out_path),
-            mode=mode,
-            background_path=str(bg_path) if bg_path is not None else None,
-        )
 
-        with out_path.open("rb") as f:
-            image_bytes = f.read()
-
-        base_name = os.path.splitext(image.filename or "output")[0]
-        out_filename = f"{base_name}_aurora.png"
-
-        accept_header = request.headers.get("accept", "")
-        if "image/png" in accept_header or "image/*" in accept_header or "*/*" in accept_header:
-            headers = {}
-            if provider_notice:
-                headers["X-Aurora-Notice"] = provider_notice
-            if provider_info:
-                headers["X-Aurora-Provider"] = provider_info.get("provider", "unknown")
-                headers["X-Aurora-Elapsed"] = str(provider_info.get("elapsedSeconds", 0))
-                headers["X-Aurora-ETA"] = provider_info.get("etaText", "")
-            return Response(
-                content=image_bytes,
-                media_type="image/png",
-                headers=headers if headers else None
+@app.post("/process")
+async def process_image(
+    request: Request,
+    image: UploadFile = File(...),
+    mode: str = Form("remove_background"),
+    background: UploadFile | None = File(None),
+    bg_type: str = Form("upload"),
+    bg_prompt: str = Form(""),
+    bg_quality: str = Form("fast"),
+    bg_provider: str = Form("lcm"),
+    bg_seed: int | None = Form(None),
+    seg_quality: str = Form(""),
+    output_format: str = Form("", alias="format"),
+    compression: str = Form(""),
+    profile: str = Form(""),
+):
+    try:
+        _validate_output(output_format, compression)
+        requested = negotiate_format(request.headers.get("accept", ""), output_format)
+    except ValueError as e:
+        return _error_response("Invalid output options", str(e))
+    try:
+        await run_in_threadpool(_validate_seg_quality, seg_quality)
+    except ValueError as e:
+        return _error_response("Invalid segmentation quality", str(e), status_code=422)
+    inline_html = requested is None
+    
+    try:
+        contents = await image.read()
+        bg_contents = await background.read() if background is not None else None
+
+        session, profile_header = _start_profile(request.headers.get("x-aurora-profile") or profile, mode)
+        try:
+            output = await _produce(
+                contents, mode, bg_type, bg_contents or None, bg_prompt, bg_quality, bg_provider, bg_seed,
+                seg_quality=seg_quality,
+                output_format=requested or normalize_format(output_format) or DEFAULT_FORMAT,
+                compression=compression,
             )
+        except BaseException as e:
+            if session is not None:
+                profiling.finish(session, mode=mode, status="error", error=f"{type(e).__name__}: {e}")
+            raise
+        output.profile = session
+        if profile_header:
+            output.headers["X-Aurora-Profile"] = profile_header
 
-        b64_image = base64.b64encode(image_bytes).decode("ascii")
-        data_url = f"data:image/png;base64,{b64_image}"
+        return await _result_response(output, image.filename, inline_html)
 
-        result_html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8" />
-  <title>Aurora AI - Result</title>
-  <style>
-    body {{ font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; margin: 2rem; }}
-    .actions {{ margin-bottom: 1rem; display: flex; gap: 0.75rem; align-items: center; flex-wrap: wrap; }}
-    .btn {{ padding: 0.5rem 1rem; border-radius: 4px; border: none; background: #2563eb; color: white; cursor: pointer; text-decoration: none; }}
-    .btn:hover {{ background: #1d4ed8; }}
-    img {{ max-width: 100%; height: auto; border-radius: 4px; border: 1px solid #e5e7eb; }}
-  </style>
-</head>
-<body>
-  <h1>Aurora AI - Result</h1>
-  <div class="actions">
-    <a class="btn" href="/"">Process another image</a>
-    <a class="btn" href="{data_url}" download="{out_filename}">Download PNG</a>
-  </div>
-  <div>
-    <img src="{data_url}" alt="Processed result" />
-  </div>
-</body>
-</html>
-"""
-        headers = {}
-        if provider_notice:
-            headers["X-Aurora-Notice"] = provider_notice
-        if provider_info:
-            headers["X-Aurora-Provider"] = provider_info.get("provider", "unknown")
-            headers["X-Aurora-Elapsed"] = str(provider_info.get("elapsedSeconds", 0))
-            headers["X-Aurora-ETA"] = provider_info.get("etaText", "")
-        return HTMLResponse(content=result_html, headers=headers if headers else None)
+    except QueueFullError as e:
+        print(f"Rejecting request: {e}")
+        return _busy_response(e)
+    except BackgroundGenerationError as e:
+        return _error_response("Background generation error", str(e))
+    except Exception as e:
+        return _error_response(
+            "Processing error",
+            "Failed to process image. Please try a different file or adjust your settings.",
+        )
 
+
+async def _run_job(job, contents: bytes, mode: str, bg_type: str, bg_contents: bytes | None,
+                   bg_prompt: str, bg_quality: str, bg_provider: str, bg_seed: int | None,
+                   seg_quality: str = "", output_format: str = "", compression: str = "") -> None:
+    try:
+        output = await _produce(
+            contents, mode, bg_type, bg_contents, bg_prompt, bg_quality, bg_provider, bg_seed,
+            progress_callback=job.set_stage,
+            seg_quality=seg_quality,
+            output_format=normalize_format(output_format) or DEFAULT_FORMAT,
+            compression=compression,
+        )
+        image_bytes = await output.read()
+        headers = {**output.headers, "Server-Timing": output.timer.server_timing()}
+        job.succeed(image_bytes, output.media_type, headers, output.provider_info)
+        print(f"Job {job.id} finished ({mode})")
     except Exception as e:
-        error_html = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8" />
-  <title>Aurora AI - Error</title>
-  <style>
-    body { font-family: system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; margin: 2rem; }
-    .card { max-width: 480px; padding: 1.5rem; border-radius: 6px; border: 1px solid #fecaca; background: #fef2f2; }
-    h1 { margin-top: 0; color: #b91c1c; }
-    p { margin: 0.5rem 0; }
-    .btn { display: inline-block; margin-top: 1rem; padding: 0.5rem 1rem; border-radius: 4px; border: none; background: #2563eb; color: white; text-decoration: none; }
-    .btn:hover { background: #1d4ed8; }
-  </style>
-</head>
-<body>
-  <div class="card">
-    <h1>Processing error</h1>
-    <p>Failed to process image. Please try a different file or adjust your settings.</p>
-    <a class="btn" href="/">Back to form</a>
-  </div>
-</body>
-</html>
-"""
-        return HTMLResponse(content=error_html, status_code=400)
-    finally:
-        cleanup_paths(*temp_files)
-        print("Temp cleanup OK")
+        print(f"Job {job.id} failed: {type(e).__name__}: {e}")
+        job.fail(str(e))
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    image: UploadFile = File(...),
+    mode: str = Form("remove_background"),
+    background: UploadFile | None = File(None),
+    bg_type: str = Form("upload"),
+    bg_prompt: str = Form(""),
+    bg_quality: str = Form("fast"),
+    bg_provider: str = Form("lcm"),
+    bg_seed: int | None = Form(None),
+    seg_quality: str = Form(""),
+    output_format: str = Form("", alias="format"),
+    compression: str = Form(""),
+) -> JSONResponse:
+    try:
+        _validate_output(output_format, compression)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    try:
+        await run_in_threadpool(_validate_seg_quality, seg_quality)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=422)
+    contents = await image.read()
+    bg_contents = await background.read() if background is not None else None
+
+    try:
+        job = job_store.create(mode, image.filename)
+    except JobStoreFullError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=429, headers={"Retry-After": "5"})
+
+    job.task = asyncio.create_task(
+        _run_job(job, contents, mode, bg_type, bg_contents or None, bg_prompt, bg_quality, bg_provider, bg_seed,
+                 seg_quality, output_format, compression)
+    )
+    return JSONResponse(
+        content={**job.to_dict(), "statusUrl": f"/jobs/{job.id}"},
+        status_code=202,
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> JSONResponse:
+    job = job_store.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found or expired"}, status_code=404)
+    return JSONResponse(content=job.to_dict())
+
+
+@app.get("/results/{result_id}")
+async def get_stored_result(result_id: str, request: Request, download: bool = False):
+    result = result_store.get(result_id)
+    if result is None:
+        return JSONResponse(content={"error": "Result not found or expired"}, status_code=404)
+
+    disposition = "attachment" if download else "inline"
+    headers = {
+        **result.headers,
+        "ETag": result.etag,
+        "Cache-Control": f"private, max-age={result_store.remaining_seconds(result)}, immutable",
+        "Content-Disposition": f'{disposition}; filename="{result.filename}"',
+    }
+    if result.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if result.path is not None:
+        return FileResponse(result.path, media_type=result.media_type, headers=headers)
+    return Response(content=result.payload, media_type=result.media_type, headers=headers)
+
+
+@app.get("/profiles")
+async def get_profiles() -> JSONResponse:
+    if not profiling.ENABLED:
+        return JSONResponse(content={"error": "Profiling is disabled (set AURORA_PROFILING=1)"}, status_code=404)
+    return JSONResponse(content={"profiles": await run_in_threadpool(profiling.list_profiles)})
+
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "json"):
+    if not profiling.ENABLED:
+        return JSONResponse(content={"error": "Profiling is disabled (set AURORA_PROFILING=1)"}, status_code=404)
+    if format == "pstats":
+        path = profiling.pstats_path(profile_id)
+        if path is not None:
+            return FileResponse(path, media_type="application/octet-stream", filename=f"aurora-{profile_id}.prof")
+    else:
+        path = profiling.summary_path(profile_id)
+        if path is not None:
+            return FileResponse(path, media_type="application/json")
+    return JSONResponse(content={"error": "Profile not found"}, status_code=404)
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Job not found or expired"}, status_code=404)
+    if job.status != SUCCEEDED:
+        return JSONResponse(content=job.to_dict(), status_code=409)
+
+    headers = dict(job.headers)
+    output_format = normalize_format(job.media_type)
+    headers["Content-Disposition"] = f'inline; filename="{_output_filename(job.filename, output_format)}"'
+    return Response(content=job.result, media_type=job.media_type, headers=headers)
@@ -0,0 +1,161 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+import traceback
+from typing import Dict, List
+
+WORKERS = max(1, int(os.environ.get("AURORA_WORKERS", "1")))
+WORKER_THREADS = int(os.environ.get("AURORA_WORKER_THREADS", "0"))
+PRELOAD_MODES = [
+    mode.strip()
+    for mode in os.environ.get(
+        "AURORA_PRELOAD_MODES", os.environ.get("AURORA_WARMUP_MODES", "remove_background")
+    ).split(",")
+    if mode.strip()
+]
+_RESPAWN_DELAY = 1.0
+_BACKLOG = 2048
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _preload(modes: List[str]) -> None:
+    import torch
+
+    if torch.cuda.is_available():
+        print("CUDA is available; CUDA state cannot cross fork(), so each worker loads its own models")
+        return
+
+    # Forked children hang in libgomp if the parent ever ran a multi-threaded
+    # OpenMP region, so the master loads with a single intra-op thread.
+    torch.set_num_threads(1)
+
+    from backend.app.services import warmup
+    from backend.app.services.model_registry import registry
+
+    start = time.monotonic()
+    inference = warmup.import_inference()
+    for mode in modes:
+        try:
+            inference.preload_models(mode)
+        except Exception as exc:
+            print(f"✗ Preloading {mode} failed, workers will load it on demand: {type(exc).__name__}: {exc}")
+    print(
+        f"✓ Preloaded {', '.join(modes) or 'no modes'} in {time.monotonic() - start:.2f}s "
+        f"(~{registry.loaded_bytes() / 1024 / 1024:.0f} MB shared with workers)"
+    )
+
+
+def _run_worker(index: int, sock: socket.socket, threads: int) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    import torch
+    import uvicorn
+
+    from backend.app.main import app
+
+    torch.set_num_threads(threads)
+    print(f"Worker {index} (pid {os.getpid()}) serving with {threads} torch thread(s)")
+    uvicorn.Server(uvicorn.Config(app, lifespan="on")).run(sockets=[sock])
+
+
+def _spawn(index: int, sock: socket.socket, threads: int) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 0
+    try:
+        _run_worker(index, sock, threads)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def serve(host: str, port: int, workers: int, threads: int, modes: List[str]) -> None:
+    if workers > 1:
+        # Workers don't share memory tiers, so /results/{id} has to go through
+        # the disk tier to be found by whichever worker gets the request.
+        os.environ.setdefault("AURORA_RESULT_STORE_MB", "0")
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    # Probe CUDA through NVML so the check itself doesn't initialise CUDA in the master.
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+
+    sock = _bind(host, port)
+    _preload(modes)
+
+    import backend.app.main  # noqa: F401
+
+    # Move everything loaded so far out of the collector's reach; otherwise the
+    # first collection in each worker writes to every object header and copies
+    # the pages the workers are meant to share.
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        kill = signal.SIGKILL if stopping else signal.SIGTERM
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, kill)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        children[_spawn(index, sock, threads)] = index
+    print(f"✓ Serving on http://{host}:{port} with {workers} worker(s)")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"✗ Worker {index} (pid {pid}) exited with code {os.waitstatus_to_exitcode(status)}; restarting")
+        time.sleep(_RESPAWN_DELAY)
+        if not stopping:
+            children[_spawn(index, sock, threads)] = index
+
+    sock.close()
+    print("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-fork server: load the models once, then fork workers that share their weights"
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--threads", type=int, default=WORKER_THREADS, help="Torch threads per worker (0 = cores / workers)")
+    parser.add_argument("--preload", default=",".join(PRELOAD_MODES), help="Comma-separated modes whose models are loaded before forking")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.preload.split(",") if mode.strip()]
+    serve(args.host, args.port, max(1, args.workers), max(0, args.threads), modes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from PIL import Image
+
+from backend.app.services import inference
+from backend.app.services.encoding import DEFAULT_FORMAT, EXTENSIONS, normalize_format, possible_formats
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
+MANIFEST_EXTENSIONS = {".txt", ".lst", ".csv"}
+
+
+def is_batch_source(source: str) -> bool:
+    return (
+        os.path.isdir(source)
+        or glob.has_magic(source)
+        or Path(source).suffix.lower() in MANIFEST_EXTENSIONS
+    )
+
+
+def collect_inputs(source: str, recursive: bool = False) -> tuple[list[Path], Path]:
+    path = Path(source)
+    if path.is_dir():
+        pattern = "**/*" if recursive else "*"
+        files = [p for p in path.glob(pattern) if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS]
+        return sorted(files), path
+
+    if glob.has_magic(source):
+        files = [Path(p) for p in glob.glob(source, recursive=recursive) if Path(p).is_file()]
+        root = Path(os.path.commonpath([str(p.parent) for p in files])) if files else Path(".")
+        return sorted(files), root
+
+    if path.suffix.lower() in MANIFEST_EXTENSIONS:
+        files = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            entry = line.split(",")[0].strip()
+            if not entry or entry.startswith("#"):
+                continue
+            entry_path = Path(entry)
+            files.append(entry_path if entry_path.is_absolute() else path.parent / entry_path)
+        root = Path(os.path.commonpath([str(p.parent) for p in files])) if files else path.parent
+        return files, root
+
+    raise ValueError(f"Not a directory, glob or manifest: {source}")
+
+
+def output_path_for(input_path: Path, input_root: Path, output_dir: Path, output_format: str = "png") -> Path:
+    try:
+        relative = input_path.relative_to(input_root)
+    except ValueError:
+        relative = Path(input_path.name)
+    return output_dir / relative.with_suffix(EXTENSIONS[output_format])
+
+
+def _decode(path: Path) -> Image.Image:
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def _encode(image: Image.Image, output_path: Path, output_format: str, compression: str | None) -> None:
+    partial = output_path.with_name(output_path.name + ".part")
+    actual_format = inference.save_result(image, partial, output_format, compression)
+    os.replace(partial, output_path.with_suffix(EXTENSIONS[actual_format]))
+
+
+def run_batch(
+    inputs: Iterable[Path],
+    input_root: Path,
+    output_dir: str,
+    mode: str = "remove_background",
+    background_path: str | None = None,
+    workers: int = 1,
+    io_workers: int = 4,
+    overwrite: bool = False,
+    output_format: str | None = None,
+    compression: str | None = None,
+) -> dict:
+    output_format = normalize_format(output_format) or DEFAULT_FORMAT
+    inference.preload_models(mode)
+    output_root = Path(output_dir)
+    background = _decode(Path(background_path)) if background_path else None
+
+    jobs = []
+    skipped = 0
+    for input_path in inputs:
+        output_path = output_path_for(input_path, input_root, output_root, output_format)
+        # A transparent result requested as JPEG is written as PNG instead.
+        if not overwrite and any(
+            output_path.with_suffix(EXTENSIONS[fmt]).exists() for fmt in possible_formats(output_format)
+        ):
+            skipped += 1
+            continue
+        jobs.append((input_path, output_path))
+
+    print(f"Batch: {len(jobs)} to process, {skipped} already done, mode={mode}")
+
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max(1, workers) * 2 + max(1, io_workers))
+    counters = {"processed": 0, "failed": 0, "pixels": 0}
+    failures: list[tuple[str, str]] = []
+    start = time.monotonic()
+
+    def record_failure(input_path: Path, exc: BaseException) -> None:
+        with lock:
+            counters["failed"] += 1
+            failures.append((str(input_path), f"{type(exc).__name__}: {exc}"))
+        print(f"✗ {input_path}: {type(exc).__name__}: {exc}")
+
+    def finish(input_path: Path, output_path: Path, pixels: int, future) -> None:
+        try:
+            future.result()
+        except Exception as exc:
+            record_failure(input_path, exc)
+        else:
+            with lock:
+                counters["processed"] += 1
+                counters["pixels"] += pixels
+                done = counters["processed"] + counters["failed"]
+            if done % 25 == 0 or done == len(jobs):
+                elapsed = time.monotonic() - start
+                print(f"  {done}/{len(jobs)} done ({done / elapsed:.2f} images/s)")
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max(1, io_workers), thread_name_prefix="aurora-batch-io") as io_pool, \
+            ThreadPoolExecutor(max(1, workers), thread_name_prefix="aurora-batch-infer") as infer_pool:
+
+        def infer(input_path: Path, output_path: Path, decoded) -> None:
+            try:
+                image = decoded.result()
+                pixels = image.size[0] * image.size[1]
+                result = inference.run_pipeline(image, mode=mode, background=background)
+            except Exception as exc:
+                record_failure(input_path, exc)
+                slots.release()
+                return
+            encoded = io_pool.submit(_encode, result, output_path, output_format, compression)
+            encoded.add_done_callback(lambda future: finish(input_path, output_path, pixels, future))
+
+        for input_path, output_path in jobs:
+            slots.acquire()
+            decoded = io_pool.submit(_decode, input_path)
+            infer_pool.submit(infer, input_path, output_path, decoded)
+
+    elapsed = time.monotonic() - start
+    summary = {
+        "mode": mode,
+        "total": len(jobs) + skipped,
+        "processed": counters["processed"],
+        "skipped": skipped,
+        "failed": counters["failed"],
+        "elapsedSeconds": round(elapsed, 2),
+        "imagesPerSecond": round(counters["processed"] / elapsed, 3) if elapsed > 0 else 0.0,
+        "megapixelsPerSecond": round(counters["pixels"] / 1e6 / elapsed, 3) if elapsed > 0 else 0.0,
+        "failures": failures,
+    }
+
+    print(
+        f"✓ Batch finished: {summary['processed']} processed, {summary['skipped']} skipped, "
+        f"{summary['failed']} failed in {summary['elapsedSeconds']}s "
+        f"({summary['imagesPerSecond']} images/s, {summary['megapixelsPerSecond']} MP/s)"
+    )
+    return summary
@@ -0,0 +1,83 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, List
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], List[Any]],
+        max_batch: int,
+        max_wait_ms: float,
+        name: str = "batcher",
+    ) -> None:
+        self._run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=f"aurora-{self.name}", daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any, key: Hashable = None) -> Any:
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((key, item, future))
+        return future.result()
+
+    def _collect(self) -> list:
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _loop(self) -> None:
+        while True:
+            pending = self._collect()
+
+            groups: dict = {}
+            for key, item, future in pending:
+                groups.setdefault(key, []).append((item, future))
+
+            for group in groups.values():
+                futures = [future for _, future in group]
+                try:
+                    results = list(self._run_batch([item for item, _ in group]))
+                    if len(results) != len(futures):
+                        raise RuntimeError(
+                            f"{self.name}: batch of {len(futures)} items returned {len(results)} results"
+                        )
+                except BaseException as exc:
+                    for future in futures:
+                        future.set_exception(exc)
+                    continue
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+                self.batches += 1
+                self.items += len(group)
+
+    def stats(self) -> dict:
+        return {
+            "maxBatch": self.max_batch,
+            "maxWaitMs": round(self.max_wait * 1000, 1),
+            "batches": self.batches,
+            "items": self.items,
+            "avgBatchSize": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -1,17 +1,33 @@
+import io
 import json
 import os
 import platform
+import threading
 import time
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterable
 
 from PIL import Image
 
+from backend.app.services.cache import ByteCache, pack_entry, unpack_entry
+from backend.app.services.model_registry import registry
+from backend.app.services.singleflight import ThreadSingleFlight
+from backend.app.utils.temp_paths import temp_dir
+
 OPENVINO_PROVIDER = "openvino"
 LCM_PROVIDER = "lcm"
 
 STATE_FILE = Path(__file__).resolve().parent / "bg_provider_state.json"
 
+_BG_CACHE = ByteCache(
+    "background",
+    max_bytes=int(float(os.environ.get("AURORA_BG_CACHE_MB", "128")) * 1024 * 1024),
+    disk_dir=os.environ.get("AURORA_BG_CACHE_DIR") or (temp_dir() / "aurora-bg-cache"),
+    disk_max_bytes=int(float(os.environ.get("AURORA_BG_CACHE_DISK_MB", "1024")) * 1024 * 1024),
+)
+
+_GENERATION_FLIGHT = ThreadSingleFlight("background")
+
 
 def _log_cpu_info() -> None:
     try:
@@ -45,14 +61,71 @@ def _openvino_importable() -> bool:
         return False
 
 
+def _seed_kwargs(seed: Optional[int]) -> Dict[str, Any]:
+    if seed is None:
+        return {}
+    import torch
+    return {"generator": torch.Generator("cpu").manual_seed(int(seed))}
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.lower().split())
+
+
+def normalize_provider(provider_pref: str | None) -> str:
+    provider_pref = provider_pref.lower() if provider_pref else LCM_PROVIDER
+    if provider_pref not in (OPENVINO_PROVIDER, LCM_PROVIDER):
+        return LCM_PROVIDER
+    return provider_pref
+
+
+def resolve_provider(provider_pref: str | None) -> str:
+    # Without OpenVINO installed an "openvino" request can only ever be served by LCM.
+    provider = normalize_provider(provider_pref)
+    if provider == OPENVINO_PROVIDER and not _openvino_importable():
+        return LCM_PROVIDER
+    return provider
+
+
+def _cache_key(prompt: str, provider: str, quality: str, seed: Optional[int]) -> str:
+    return f"{normalize_prompt(prompt)}|{provider}|{quality}|{seed}"
+
+
+def _load_cached(key: str) -> Optional[Tuple[Image.Image, Dict[str, Any]]]:
+    packed = _BG_CACHE.get(key)
+    if packed is None:
+        return None
+    try:
+        payload, meta = unpack_entry(packed)
+        image = Image.open(io.BytesIO(payload))
+        image.load()
+    except Exception as exc:
+        print(f"Ignoring unreadable cached background: {type(exc).__name__}: {exc}")
+        return None
+    return image, meta
+
+
+def _store_cached(key: str, image: Image.Image, info: Dict[str, Any]) -> None:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    _BG_CACHE.put(key, pack_entry(buffer.getvalue(), info))
+
+
+def background_cache_stats() -> Dict[str, Any]:
+    return _BG_CACHE.stats()
+
+
+def coalescing_stats() -> Dict[str, int]:
+    return _GENERATION_FLIGHT.stats()
+
+
 class OpenVINOProvider:
-    def __init__(self) -> None:
-        self._pipeline = None
+    model_name = "openvino_lcm"
 
     def _load_pipeline(self):
-        if self._pipeline is not None:
-            return self._pipeline
+        return registry.get(self.model_name, self._build_pipeline)
 
+    def _build_pipeline(self):
         from optimum.intel import OVStableDiffusionPipeline
 
         model_id = "OpenVINO/LCM_Dreamshaper_v7-int8-ov"
@@ -68,27 +141,26 @@ class OpenVINOProvider:
             pipeline.set_progress_bar_config(disable=True)
 
         print("✓ OpenVINO pipeline loaded and compiled successfully")
-        self._pipeline = pipeline
         return pipeline
 
-    def generate(self, prompt: str) -> Image.Image:
+    def generate(self, prompt: str, seed: Optional[int] = None) -> Image.Image:
         pipeline = self._load_pipeline()
         result = pipeline(
             prompt=prompt,
             num_inference_steps=4,
             guidance_scale=1.0,
+            **_seed_kwargs(seed),
         )
         return result.images[0]
 
 
 class LCMProvider:
-    def __init__(self) -> None:
-        self._pipeline = None
+    model_name = "lcm"
 
     def _load_pipeline(self):
-        if self._pipeline is not None:
-            return self._pipeline
+        return registry.get(self.model_name, self._build_pipeline)
 
+    def _build_pipeline(self):
         import torch
         from diffusers import DiffusionPipeline
 
@@ -105,15 +177,15 @@ class LCMProvider:
         if hasattr(pipeline, "set_progress_bar_config"):
             pipeline.set_progress_bar_config(disable=True)
 
-        self._pipeline = pipeline
         return pipeline
 
-    def generate(self, prompt: str) -> Image.Image:
+    def generate(self, prompt: str, seed: Optional[int] = None) -> Image.Image:
         pipeline = self._load_pipeline()
         result = pipeline(
             prompt=prompt,
             num_inference_steps=4,
             guidance_scale=1.0,
+            **_seed_kwargs(seed),
         )
         return result.images[0]
 
@@ -125,19 +197,53 @@ _lcm_provider = LCMProvider()
 _log_cpu_info()
 
 
-def generate_background(prompt: str, quality: str = "fast", provider_pref: str = "lcm") -> Tuple[Image.Image, Dict[str, Any]]:
+def generate_background(
+    prompt: str,
+    quality: str = "fast",
+    provider_pref: str = "lcm",
+    seed: Optional[int] = None,
+) -> Tuple[Image.Image, Dict[str, Any]]:
     if not prompt or not prompt.strip():
         raise ValueError("Prompt cannot be empty")
 
     total_start = time.monotonic()
     
-    provider_pref = provider_pref.lower() if provider_pref else "lcm"
-    if provider_pref not in ("auto", "openvino", "lcm"):
-        provider_pref = "lcm"
+    provider_pref = normalize_provider(provider_pref)
     
-    if provider_pref == "auto":
-        provider_pref = "lcm"
+    # Backgrounds are cached under the provider that produced them.
+    cache_key = _cache_key(prompt, resolve_provider(provider_pref), quality, seed)
+    cached = _load_cached(cache_key)
+    if cached is not None:
+        image, info = cached
+        print(f"✓ Using cached background for prompt: {normalize_prompt(prompt)[:60]}")
+        return image, {
+            **info,
+            "elapsedSeconds": round(time.monotonic() - total_start, 2),
+            "message": f"{info.get('message', 'Generated background')} (cached)",
+            "etaText": "Instant (cached)",
+            "cached": True,
+        }
     
+    (image, info), coalesced = _GENERATION_FLIGHT.run(
+        cache_key, lambda: _generate_uncached(prompt, provider_pref, quality, seed)
+    )
+    if coalesced:
+        print(f"✓ Shared an in-flight generation for prompt: {normalize_prompt(prompt)[:60]}")
+    return image, {
+        **info,
+        "elapsedSeconds": round(time.monotonic() - total_start, 2),
+        "cached": False,
+        "coalesced": coalesced,
+    }
+
+
+def _generate_uncached(
+    prompt: str,
+    provider_pref: str,
+    quality: str,
+    seed: Optional[int],
+) -> Tuple[Image.Image, Dict[str, Any]]:
+    total_start = time.monotonic()
     if provider_pref == "openvino":
         print("Trying OpenVINO... [forced]")
         if not _openvino_importable():
@@ -145,17 +251,19 @@ def generate_background(prompt: str, quality: str = "fast", provider_pref: str =
         else:
             ov_start = time.monotonic()
             try:
-                image = _openvino_provider.generate(prompt)
+                image = _openvino_provider.generate(prompt, seed=seed)
                 elapsed = time.monotonic() - ov_start
                 total_elapsed = time.monotonic() - total_start
                 print(f"✓ OpenVINO generation successful ({elapsed:.2f}s)")
                 
-                return image, {
+                info = {
                     "provider": OPENVINO_PROVIDER,
                     "elapsedSeconds": round(total_elapsed, 2),
                     "message": "Using OpenVINO (Intel-optimized)",
                     "etaText": "Typically under 1 minute",
                 }
+                _store_cached(_cache_key(prompt, OPENVINO_PROVIDER, quality, seed), image, info)
+                return image, info
             except Exception as exc:
                 elapsed = time.monotonic() - ov_start
                 error_type = type(exc).__name__
@@ -165,17 +273,46 @@ def generate_background(prompt: str, quality: str = "fast", provider_pref: str =
     
     print("Using provider: LCM (CPU)")
     lcm_start = time.monotonic()
-    image = _lcm_provider.generate(prompt)
+    image = _lcm_provider.generate(prompt, seed=seed)
     lcm_elapsed = time.monotonic() - lcm_start
     total_elapsed = time.monotonic() - total_start
     print(f"✓ LCM generation successful ({lcm_elapsed:.2f}s)")
     
-    return image, {
+    info = {
         "provider": LCM_PROVIDER,
         "elapsedSeconds": round(total_elapsed, 2),
         "message": "Using LCM (CPU)",
         "etaText": "Typically around 1 minute",
     }
+    _store_cached(_cache_key(prompt, LCM_PROVIDER, quality, seed), image, info)
+    return image, info
+
+
+def prewarm_backgrounds(prompts: Iterable[str], quality: str = "fast", provider_pref: str = "lcm") -> None:
+    for prompt in prompts:
+        if not prompt.strip():
+            continue
+        try:
+            generate_background(prompt, quality=quality, provider_pref=provider_pref)
+        except Exception as exc:
+            print(f"Background pre-warm failed for {prompt!r}: {type(exc).__name__}: {exc}")
+
+
+def start_prewarm_from_env() -> Optional[threading.Thread]:
+    prompts = [p for p in os.environ.get("AURORA_BG_PREWARM_PROMPTS", "").split("|") if p.strip()]
+    if not prompts:
+        return None
+    
+    print(f"Pre-warming {len(prompts)} background prompt(s) in the background...")
+    thread = threading.Thread(
+        target=prewarm_backgrounds,
+        args=(prompts,),
+        kwargs={"provider_pref": os.environ.get("AURORA_BG_PREWARM_PROVIDER", "lcm")},
+        name="aurora-bg-prewarm",
+        daemon=True,
+    )
+    thread.start()
+    return thread
 
 
 def smoke_test_background_provider() -> dict:
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class ByteCache:
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        disk_dir: str | Path | None = None,
+        disk_max_bytes: int = 0,
+        max_item_bytes: int | None = None,
+    ) -> None:
+        self.name = name
+        self.max_bytes = max(0, max_bytes)
+        self.max_item_bytes = self.max_bytes if max_item_bytes is None else max_item_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = max(0, disk_max_bytes)
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{self._digest(key)}.bin"
+
+    def _store_memory(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_item_bytes or len(value) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = value
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                value = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._store_memory(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._store_memory(key, value)
+
+        if self.disk_dir is None or len(value) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            print(f"{self.name} cache: failed to write {path.name}: {exc}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        try:
+            files = [(path, path.stat()) for path in self.disk_dir.glob("*.bin")]
+        except OSError:
+            return
+        total = sum(stat.st_size for _, stat in files)
+        if total <= self.disk_max_bytes:
+            return
+        for path, stat in sorted(files, key=lambda item: item[1].st_mtime):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= stat.st_size
+            if total <= self.disk_max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "diskDir": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+def content_hash(*parts: bytes | str | None) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b"\x00"
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def pack_entry(payload: bytes, meta: Dict[str, Any]) -> bytes:
+    encoded_meta = json.dumps(meta).encode("utf-8")
+    return len(encoded_meta).to_bytes(4, "little") + encoded_meta + payload
+
+
+def unpack_entry(packed: bytes) -> Tuple[bytes, Dict[str, Any]]:
+    meta_length = int.from_bytes(packed[:4], "little")
+    meta = json.loads(packed[4:4 + meta_length].decode("utf-8"))
+    return packed[4 + meta_length:], meta
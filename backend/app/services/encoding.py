@@ -0,0 +1,229 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict
+
+from PIL import Image
+
+from backend.app.services import profiling
+
+PNG = "png"
+WEBP = "webp"
+JPEG = "jpeg"
+
+OUTPUT_FORMATS = (PNG, WEBP, JPEG)
+MEDIA_TYPES = {PNG: "image/png", WEBP: "image/webp", JPEG: "image/jpeg"}
+EXTENSIONS = {PNG: ".png", WEBP: ".webp", JPEG: ".jpg"}
+COMPRESSION_PRESETS = ("fast", "default", "best", "lossless")
+
+_PNG_LEVELS = {"fast": 1, "default": 6, "best": 9}
+_LOSSY_QUALITY = {"fast": 80, "default": 90, "best": 95}
+_WEBP_METHODS = {"fast": 0, "default": 4, "best": 6}
+
+DEFAULT_FORMAT = os.environ.get("AURORA_OUTPUT_FORMAT", PNG).strip().lower()
+DEFAULT_COMPRESSION = os.environ.get("AURORA_OUTPUT_COMPRESSION", "default").strip().lower()
+STREAM_CHUNK_BYTES = int(os.environ.get("AURORA_STREAM_CHUNK_KB", "256")) * 1024
+_STREAM_QUEUE_CHUNKS = 8
+_STREAM_STALL_SECONDS = 2.0
+_ENCODE_WORKERS = max(1, int(os.environ.get("AURORA_ENCODE_WORKERS", str(os.cpu_count() or 1))))
+_ENCODE_EXECUTOR = ThreadPoolExecutor(max_workers=_ENCODE_WORKERS, thread_name_prefix="aurora-encode")
+
+
+class EncodingCancelled(Exception):
+    pass
+
+
+def normalize_format(fmt: str | None) -> str | None:
+    if not fmt:
+        return None
+    fmt = fmt.strip().lower().lstrip(".")
+    fmt = {"jpg": JPEG, "image/png": PNG, "image/webp": WEBP, "image/jpeg": JPEG}.get(fmt, fmt)
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}. Must be one of {', '.join(OUTPUT_FORMATS)}")
+    return fmt
+
+
+def format_for_path(path: str | Path) -> str:
+    suffix = Path(path).suffix.lower()
+    for fmt, extension in EXTENSIONS.items():
+        if suffix == extension or (fmt == JPEG and suffix == ".jpeg"):
+            return fmt
+    return DEFAULT_FORMAT
+
+
+def negotiate_format(accept_header: str, requested: str | None = None) -> str | None:
+    ranges = []
+    for position, part in enumerate(accept_header.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            ranges.append((-quality, position, media_type.lower()))
+
+    accepted = [media_type for _, _, media_type in sorted(ranges)]
+    wildcard = "image/*" in accepted or "*/*" in accepted
+    requested = normalize_format(requested)
+    if requested:
+        return requested if wildcard or MEDIA_TYPES[requested] in accepted else None
+
+    if wildcard or MEDIA_TYPES[DEFAULT_FORMAT] in accepted:
+        return DEFAULT_FORMAT
+    for media_type in accepted:
+        for fmt, fmt_media_type in MEDIA_TYPES.items():
+            if media_type == fmt_media_type:
+                return fmt
+    return None
+
+
+def has_transparency(image: Image.Image) -> bool:
+    if image.mode in ("RGBA", "LA"):
+        return image.getextrema()[-1][0] < 255
+    return "transparency" in image.info
+
+
+def resolve_format(image: Image.Image, fmt: str) -> str:
+    if fmt == JPEG and has_transparency(image):
+        print("JPEG requested for a transparent result; encoding as PNG instead")
+        return PNG
+    return fmt
+
+
+def possible_formats(fmt: str) -> tuple[str, ...]:
+    return (fmt, PNG) if fmt == JPEG else (fmt,)
+
+
+def save_options(fmt: str, compression: str | int | None = None) -> Dict[str, Any]:
+    compression = str(compression if compression not in (None, "") else DEFAULT_COMPRESSION).strip().lower()
+    preset = compression if compression in COMPRESSION_PRESETS else None
+    if preset is None:
+        try:
+            level = int(compression)
+        except ValueError:
+            raise ValueError(
+                f"Unknown compression: {compression}. Must be one of {', '.join(COMPRESSION_PRESETS)} or a number"
+            )
+
+    if fmt == PNG:
+        if preset == "lossless":
+            preset = "default"
+        return {"compress_level": _PNG_LEVELS[preset] if preset else max(0, min(level, 9))}
+    if fmt == WEBP:
+        if preset == "lossless":
+            return {"lossless": True, "quality": 80, "method": _WEBP_METHODS["default"]}
+        if preset:
+            return {"quality": _LOSSY_QUALITY[preset], "method": _WEBP_METHODS[preset]}
+        return {"quality": max(1, min(level, 100)), "method": _WEBP_METHODS["default"]}
+    if fmt == JPEG:
+        if preset == "lossless":
+            preset = "best"
+        quality = _LOSSY_QUALITY[preset] if preset else max(1, min(level, 100))
+        return {"quality": quality, "optimize": preset == "best"}
+    raise ValueError(f"Unknown output format: {fmt}")
+
+
+def encode_image(image: Image.Image, fmt: str, compression: str | int | None, fileobj) -> None:
+    if fmt == JPEG and image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(fileobj, format=fmt.upper(), **save_options(fmt, compression))
+
+
+class _ChunkWriter:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        chunks: "asyncio.Queue",
+        slots: threading.Semaphore,
+        cancelled: threading.Event,
+        chunk_bytes: int,
+    ) -> None:
+        self._loop = loop
+        self._chunks = chunks
+        self._slots = slots
+        self._cancelled = cancelled
+        self._chunk_bytes = chunk_bytes
+        self._pending = bytearray()
+        self._unbounded = False
+
+    def _put(self, item) -> None:
+        # Apply backpressure while the client keeps up, but don't let a stalled
+        # client pin an encode worker: after a while, buffer the rest instead.
+        if not self._unbounded:
+            deadline = time.monotonic() + _STREAM_STALL_SECONDS
+            while not self._slots.acquire(timeout=0.1):
+                if self._cancelled.is_set():
+                    raise EncodingCancelled()
+                if time.monotonic() >= deadline:
+                    self._unbounded = True
+                    break
+        if self._cancelled.is_set():
+            raise EncodingCancelled()
+        try:
+            self._loop.call_soon_threadsafe(self._chunks.put_nowait, item)
+        except RuntimeError:
+            raise EncodingCancelled()
+
+    def write(self, data) -> int:
+        self._pending += data
+        if len(self._pending) >= self._chunk_bytes:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._pending:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+
+
+async def stream_encoded(
+    image: Image.Image,
+    fmt: str,
+    compression: str | int | None = None,
+    chunk_bytes: int | None = None,
+) -> AsyncIterator[bytes]:
+    # The encoder runs on its own bounded pool and hands chunks straight to the
+    # event loop, so neither side ties up the default executor.
+    loop = asyncio.get_running_loop()
+    chunks: "asyncio.Queue" = asyncio.Queue()
+    slots = threading.Semaphore(_STREAM_QUEUE_CHUNKS)
+    cancelled = threading.Event()
+    done = object()
+    writer = _ChunkWriter(loop, chunks, slots, cancelled, chunk_bytes or STREAM_CHUNK_BYTES)
+
+    def encode() -> None:
+        try:
+            profiling.call(encode_image, image, fmt, compression, writer)
+            writer.close()
+            writer._put(done)
+        except EncodingCancelled:
+            pass
+        except BaseException as exc:
+            try:
+                writer._put(exc)
+            except EncodingCancelled:
+                pass
+
+    _ENCODE_EXECUTOR.submit(contextvars.copy_context().run, encode)
+    try:
+        while True:
+            item = await chunks.get()
+            slots.release()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
@@ -0,0 +1,267 @@
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import torch
+
+from backend.app.services.cache import content_hash
+from backend.app.services.precision import model_precision
+
+EAGER = "eager"
+TORCHSCRIPT = "torchscript"
+COMPILE = "compile"
+ONNX = "onnx"
+OPENVINO = "openvino"
+
+EXECUTION_BACKENDS = (EAGER, TORCHSCRIPT, COMPILE, ONNX, OPENVINO)
+
+ARTIFACT_DIR = Path(
+    os.environ.get("AURORA_MODEL_CACHE_DIR")
+    or Path(__file__).resolve().parents[2] / "models" / "compiled"
+)
+
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(ARTIFACT_DIR / "inductor"))
+os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+
+
+def _parse_backends(spec: str) -> tuple[str, Dict[str, str]]:
+    default = EAGER
+    overrides: Dict[str, str] = {}
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, backend = part.rpartition("=")
+        if backend not in EXECUTION_BACKENDS:
+            raise ValueError(
+                f"Unknown execution backend: {backend}. Must be one of {', '.join(EXECUTION_BACKENDS)}"
+            )
+        if name:
+            overrides[name] = backend
+        else:
+            default = backend
+    return default, overrides
+
+
+_DEFAULT_BACKEND, _MODEL_BACKENDS = _parse_backends(os.environ.get("AURORA_EXEC_BACKEND", EAGER))
+
+
+def backend_for(model_name: str) -> str:
+    return _MODEL_BACKENDS.get(model_name, _DEFAULT_BACKEND)
+
+
+def backend_summary() -> str:
+    parts = [_DEFAULT_BACKEND]
+    parts.extend(f"{name}={backend}" for name, backend in sorted(_MODEL_BACKENDS.items()))
+    return ",".join(parts)
+
+
+def _module(model) -> torch.nn.Module:
+    return model if isinstance(model, torch.nn.Module) else model.model
+
+
+def _fingerprint(module: torch.nn.Module) -> str:
+    state = {
+        name: value for name, value in module.state_dict().items()
+        if isinstance(value, torch.Tensor) and not value.is_quantized
+    }
+    parts: list[Any] = [torch.__version__, type(module).__name__]
+    parts.extend(f"{name}:{tuple(tensor.shape)}" for name, tensor in state.items())
+    tensors = [tensor for tensor in state.values() if tensor.numel()]
+    for tensor in tensors[:1] + tensors[-1:]:
+        parts.append(tensor.detach().cpu().contiguous().flatten()[:4096].float().numpy().tobytes())
+    return content_hash(*parts)[:16]
+
+
+_CONTAINERS = {"list": list, "tuple": tuple, "tensor": None}
+
+
+def _outputs(values: list, container: type | None) -> Any:
+    tensors = [torch.from_numpy(value) for value in values]
+    if container is None and len(tensors) == 1:
+        return tensors[0]
+    return (container or list)(tensors)
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _output_container(module: torch.nn.Module, example: torch.Tensor, artifact: Path) -> type | None:
+    # Exported graphs flatten their outputs; remember whether the module
+    # returned a list (BiRefNet does) so callers indexing it keep working.
+    path = artifact.with_suffix(".outputs.json")
+    try:
+        return _CONTAINERS[json.loads(path.read_text(encoding="utf-8"))["container"]]
+    except (OSError, ValueError, KeyError):
+        pass
+    with torch.no_grad():
+        output = module(example)
+    name = "list" if isinstance(output, list) else "tuple" if isinstance(output, tuple) else "tensor"
+    _write_atomic(path, lambda tmp: tmp.write_text(json.dumps({"container": name}), encoding="utf-8"))
+    return _CONTAINERS[name]
+
+
+def _build_torchscript(module: torch.nn.Module, example: torch.Tensor, artifact: Path):
+    path = artifact.with_suffix(".pt")
+    if path.exists():
+        return torch.jit.load(str(path), map_location=example.device)
+    traced = torch.jit.freeze(torch.jit.trace(module, example, strict=False, check_trace=False))
+    _write_atomic(path, lambda tmp: torch.jit.save(traced, str(tmp)))
+    return traced
+
+
+def _build_compile(module: torch.nn.Module, example: torch.Tensor, artifact: Path):
+    compiled = torch.compile(module, dynamic=False)
+    compiled(example)
+    return compiled
+
+
+def _build_onnx(module: torch.nn.Module, example: torch.Tensor, artifact: Path):
+    import onnxruntime
+
+    path = artifact.with_suffix(".onnx")
+    container = _output_container(module, example, artifact)
+    if not path.exists():
+        _write_atomic(path, lambda tmp: torch.onnx.export(
+            module, (example,), str(tmp), input_names=["input"], opset_version=17, dynamo=False
+        ))
+    session = onnxruntime.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+
+    def run(tensor: torch.Tensor):
+        return _outputs(session.run(None, {"input": tensor.detach().cpu().float().numpy()}), container)
+
+    return run
+
+
+def _build_openvino(module: torch.nn.Module, example: torch.Tensor, artifact: Path):
+    import openvino
+
+    path = artifact.with_suffix(".xml")
+    container = _output_container(module, example, artifact)
+    if not path.exists():
+        staging = artifact.with_name(f".{artifact.name}.{os.getpid()}")
+        staging.mkdir(parents=True, exist_ok=True)
+        try:
+            openvino.save_model(
+                openvino.convert_model(module, example_input=example), str(staging / path.name)
+            )
+            os.replace(staging / path.with_suffix(".bin").name, path.with_suffix(".bin"))
+            os.replace(staging / path.name, path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    compiled = openvino.Core().compile_model(str(path), "CPU")
+
+    def run(tensor: torch.Tensor):
+        result = compiled(tensor.detach().cpu().float().numpy())
+        return _outputs([result[output] for output in compiled.outputs], container)
+
+    return run
+
+
+_MISSING = object()
+
+_BUILDERS = {
+    TORCHSCRIPT: _build_torchscript,
+    COMPILE: _build_compile,
+    ONNX: _build_onnx,
+    OPENVINO: _build_openvino,
+}
+
+
+class CompiledModel:
+    def __init__(self, model, model_name: str, backend: str) -> None:
+        self.eager = model
+        self.module = _module(model)
+        self.model_name = model_name
+        self.backend = backend
+        self.aurora_precision = model_precision(model)
+        self.size_requirements = getattr(model, "size_requirements", None)
+        self.scale = getattr(model, "scale", 1)
+        self.fallbacks = 0
+        self._fingerprint: str | None = None
+        self._runners: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def aurora_backend(self) -> str:
+        return self.backend if not self.fallbacks else f"{self.backend}+{EAGER}"
+
+    def parameters(self):
+        return self.module.parameters()
+
+    def buffers(self):
+        return self.module.buffers()
+
+    def _artifact(self, shape: tuple) -> Path:
+        if self._fingerprint is None:
+            self._fingerprint = _fingerprint(self.module)
+        dims = "x".join(str(dim) for dim in shape)
+        return ARTIFACT_DIR / f"{self.model_name}-{self.aurora_precision}-{dims}-{self._fingerprint}"
+
+    def _build(self, example: torch.Tensor):
+        shape = tuple(example.shape)
+        start = time.monotonic()
+        try:
+            ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+            runner = _BUILDERS[self.backend](self.module, example, self._artifact(shape))
+        except Exception as exc:
+            self.fallbacks += 1
+            print(
+                f"✗ {self.model_name}: {self.backend} backend unavailable for input {shape} "
+                f"({type(exc).__name__}: {exc}); using eager PyTorch"
+            )
+            return None
+        print(f"✓ {self.model_name}: {self.backend} backend ready for input {shape} in {time.monotonic() - start:.2f}s")
+        return runner
+
+    def _runner(self, tensor: torch.Tensor):
+        shape = tuple(tensor.shape)
+        runner = self._runners.get(shape, _MISSING)
+        if runner is _MISSING:
+            with self._lock:
+                if shape not in self._runners:
+                    self._runners[shape] = self._build(tensor)
+                runner = self._runners[shape]
+        return runner
+
+    def __call__(self, tensor: torch.Tensor):
+        pad_w = pad_h = 0
+        if self.size_requirements is not None:
+            height, width = tensor.shape[-2:]
+            pad_w, pad_h = self.size_requirements.get_padding(width, height)
+            if pad_w or pad_h:
+                tensor = torch.nn.functional.pad(tensor, (0, pad_w, 0, pad_h), mode="replicate")
+
+        runner = self._runner(tensor)
+        if runner is None:
+            output = self.eager(tensor)
+        else:
+            output = runner(tensor)
+
+        if self.size_requirements is not None:
+            output = output.clamp_(0, 1)
+            if pad_w or pad_h:
+                output = output[..., :height * self.scale, :width * self.scale]
+        return output
+
+
+def compile_model(model, model_name: str, device: torch.device):
+    backend = backend_for(model_name)
+    if backend == EAGER:
+        return model
+    if backend in (ONNX, OPENVINO) and device.type != "cpu":
+        print(f"{backend} backend runs on CPU only; using eager PyTorch for {model_name}")
+        return model
+    print(f"Using {backend} execution backend for {model_name} (artifacts in {ARTIFACT_DIR})")
+    return CompiledModel(model, model_name, backend)
+
+
+def model_backend(model) -> str:
+    return getattr(model, "aurora_backend", EAGER)
@@ -1,5 +1,7 @@
 import os
 import sys
+import zlib
+import struct
 import argparse
 from pathlib import Path
 import torch
@@ -8,21 +10,31 @@ from PIL import Image
 import torchvision.transforms as transforms
 from transformers import AutoModelForImageSegmentation
 
-from backend.app.utils.aurora_utils import replace_background
-from backend.app.services import bg_providers
+from backend.app.utils.aurora_utils import refine_mask, replace_background, upscale_alpha
+from backend.app.services import bg_providers, profiling
+from backend.app.services.batching import MicroBatcher
+from backend.app.services.cache import ByteCache, content_hash
+from backend.app.services.encoding import OUTPUT_FORMATS, encode_image, format_for_path, normalize_format, resolve_format
+from backend.app.services.execution import backend_for, backend_summary, compile_model, model_backend
+from backend.app.services.metrics import stage, timed
+from backend.app.services.model_registry import registry
+from backend.app.services.precision import (
+    FP32,
+    inference_context,
+    model_precision,
+    precision_for,
+    precision_summary,
+    prepare_input,
+    prepare_model,
+    resolve_precision,
+)
 
 _DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-_MODEL = None
-_UPSCALER_2X = None
-_UPSCALER_4X = None
-_FLUX_PIPELINE_FAST = None
-_FLUX_PIPELINE_HQ = None
-_FLUX_PIPELINE_FAST_CPU = None
-_FLUX_PIPELINE_HQ_CPU = None
-
-_TRANSFORM = transforms.Compose(
+
+BIREFNET_MODEL = "birefnet"
+
+_NORMALIZE = transforms.Compose(
     [
-        transforms.Resize((1024, 1024)),
         transforms.ToTensor(),
         transforms.Normalize(
             mean=[0.485, 0.456, 0.406],
@@ -31,38 +43,70 @@ _TRANSFORM = transforms.Compose(
     ]
 )
 
-def get_model(model_path: str | None = None):
-    global _MODEL
-    
-    if _MODEL is not None:
-        return _MODEL, _DEVICE, _TRANSFORM
-    
+_TRANSFORM = transforms.Compose([transforms.Resize((1024, 1024)), _NORMALIZE])
+
+_SEG_RESOLUTIONS = (512, 768, 1024)
+_SEG_MIN_RESOLUTION = 32
+_SEG_MAX_RESOLUTION = 2048
+_SEG_QUALITY_PRESETS = {"fast": 512, "balanced": 768, "best": 1024}
+_SEG_RESOLUTION = os.environ.get("AURORA_SEG_RESOLUTION", "auto").strip().lower()
+_SEG_FITS = ("stretch", "pad")
+_SEG_FIT = os.environ.get("AURORA_SEG_FIT", "stretch").strip().lower()
+_SEG_PAD_COLOR = (124, 116, 104)
+
+_MASK_REFINE = os.environ.get("AURORA_MASK_REFINE", "1") != "0"
+_MASK_THRESHOLD = float(os.environ.get("AURORA_MASK_THRESHOLD", "0.5"))
+_MASK_REFINE_RADIUS = os.environ.get("AURORA_MASK_REFINE_RADIUS", "auto").strip().lower()
+_MASK_REFINE_EPS = float(os.environ.get("AURORA_MASK_REFINE_EPS", "0.001"))
+
+_DETERMINISTIC = os.environ.get("AURORA_DETERMINISTIC", "0") == "1"
+
+def _with_precision(model, model_name: str, device: torch.device, mode: str | None = None):
+    mode = resolve_precision(mode or precision_for(model_name), model, device)
+    if mode != FP32:
+        print(f"Using {mode} inference for {model_name}")
+    return prepare_model(model, mode)
+
+def _prepare(model, model_name: str, device: torch.device):
+    return compile_model(_with_precision(model, model_name, device), model_name, device)
+
+def _build_birefnet():
+    return _prepare(_load_birefnet(), BIREFNET_MODEL, _DEVICE)
+
+def _load_birefnet():
     print(f"Using device: {_DEVICE}")
     print("Loading BiRefNet model from Hugging Face...")
     
-    _MODEL = AutoModelForImageSegmentation.from_pretrained(
+    model = AutoModelForImageSegmentation.from_pretrained(
         "ZhengPeng7/BiRefNet",
         trust_remote_code=True
     )
-    _MODEL.to(_DEVICE)
-    _MODEL.eval()
+    model.to(_DEVICE)
+    model.eval()
     
     print("✓ BiRefNet model loaded successfully")
-    
-    return _MODEL, _DEVICE, _TRANSFORM
+    return model
+
+def get_model(model_path: str | None = None):
+    return registry.get(BIREFNET_MODEL, _build_birefnet), _DEVICE, _TRANSFORM
+
+def upscaler_model_name(scale: int) -> str:
+    return f"upscaler_{scale}x"
 
 def _load_upscaler_model(scale: int = 4):
-    global _UPSCALER_2X, _UPSCALER_4X
-    
+    if scale not in (2, 4):
+        raise ValueError(f"Only scale=2 or scale=4 are supported. Got scale={scale}")
+    return registry.get(upscaler_model_name(scale), lambda: _build_upscaler(scale))
+
+def _build_upscaler(scale: int):
+    return _prepare(_load_upscaler(scale), upscaler_model_name(scale), torch.device("cpu"))
+
+def _load_upscaler(scale: int):
     if scale == 2:
-        if _UPSCALER_2X is not None:
-            return _UPSCALER_2X
         model_name = "2xBHI_small_drct-xl"
         model_file = "model.pth"
         model_dir = "2xBHI_small_drct-xl"
     elif scale == 4:
-        if _UPSCALER_4X is not None:
-            return _UPSCALER_4X
         model_name = "4xBHI_dat2_real"
         model_file = "4xBHI_dat2_real.safetensors"
         model_dir = "4xBHI_dat2_real"
@@ -95,15 +139,11 @@ def _load_upscaler_model(scale: int = 4):
         model = model.to(torch.device("cpu"))
         model.eval()
         
-        torch.use_deterministic_algorithms(True, warn_only=True)
+        if _DETERMINISTIC:
+            torch.use_deterministic_algorithms(True, warn_only=True)
         
         print(f"✓ {model_name} upscaler loaded successfully (CPU-only, {scale}x)")
         
-        if scale == 2:
-            _UPSCALER_2X = model
-        else:
-            _UPSCALER_4X = model
-        
     except Exception as e:
         raise RuntimeError(
             f"Failed to load {scale}x upscaler model: {str(e)}\n"
@@ -112,51 +152,420 @@ def _load_upscaler_model(scale: int = 4):
     
     return model
 
-def enhance_image(image: Image.Image, scale: int = 4) -> Image.Image:
+_UPSCALE_TILE_SIZE = int(os.environ.get("AURORA_UPSCALE_TILE_SIZE", "256"))
+_UPSCALE_TILE_OVERLAP = int(os.environ.get("AURORA_UPSCALE_TILE_OVERLAP", "16"))
+_UPSCALE_TILE_BATCH = int(os.environ.get("AURORA_UPSCALE_TILE_BATCH", "1"))
+_ALPHA_UPSCALE_MODES = ("model", "resize", "guided", "mask")
+_ALPHA_UPSCALE_MODE = os.environ.get("AURORA_ALPHA_UPSCALE", "guided")
+
+def _tile_starts(length: int, tile: int, overlap: int) -> list[int]:
+    if length <= tile:
+        return [0]
+    stride = max(tile - overlap, 1)
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+def _feather_ramp(size: int, ramp: int, fade_in: bool, fade_out: bool) -> np.ndarray:
+    weights = np.ones(size, dtype=np.float32)
+    ramp = min(ramp, size // 2)
+    if ramp > 0:
+        edge = np.arange(1, ramp + 1, dtype=np.float32) / (ramp + 1)
+        if fade_in:
+            weights[:ramp] = edge
+        if fade_out:
+            weights[-ramp:] = edge[::-1]
+    return weights
+
+def _upscale_array(
+    model,
+    rgb: np.ndarray,
+    scale: int,
+    tile_size: int,
+    tile_overlap: int,
+    tile_batch: int = 1,
+    progress_callback=None,
+) -> np.ndarray:
+    height, width = rgb.shape[:2]
+    if tile_size <= 0:
+        tile_h, tile_w = height, width
+    else:
+        tile_h, tile_w = min(tile_size, height), min(tile_size, width)
+    overlap = max(0, min(tile_overlap, tile_size // 2)) if tile_size > 0 else 0
+
+    ys = _tile_starts(height, tile_h, overlap)
+    xs = _tile_starts(width, tile_w, overlap)
+    total = len(ys) * len(xs)
+    out_w = width * scale
+    band_h = tile_h * scale
+    ramp = overlap * scale
+    precision = model_precision(model)
+
+    output = np.empty((height * scale, out_w, 3), dtype=np.uint8)
+    band = np.zeros((band_h, out_w, 3), dtype=np.float32)
+    band_weight = np.zeros((band_h, out_w, 1), dtype=np.float32)
+    col_weights = [
+        _feather_ramp(tile_w * scale, ramp, x > 0, x + tile_w < width) for x in xs
+    ]
+
+    done = 0
+    for row, y in enumerate(ys):
+        row_weight = _feather_ramp(band_h, ramp, y > 0, y + tile_h < height)
+        for first in range(0, len(xs), max(tile_batch, 1)):
+            batch_xs = xs[first:first + max(tile_batch, 1)]
+            tiles = np.stack([rgb[y:y + tile_h, x:x + tile_w] for x in batch_xs])
+            tensor = torch.from_numpy(tiles).permute(0, 3, 1, 2).float().div_(255.0)
+            tensor = prepare_input(tensor, precision)
+            with torch.no_grad(), inference_context(precision, tensor.device):
+                upscaled = model(tensor)
+            upscaled = upscaled[:, :, :band_h, :tile_w * scale].float().clamp_(0, 1)
+            upscaled = upscaled.permute(0, 2, 3, 1).numpy()
+
+            for index, x in enumerate(batch_xs):
+                weight = row_weight[:, None] * col_weights[first + index][None, :]
+                x0 = x * scale
+                x1 = x0 + tile_w * scale
+                band[:, x0:x1] += upscaled[index] * weight[:, :, None]
+                band_weight[:, x0:x1] += weight[:, :, None]
+
+            done += len(batch_xs)
+            if progress_callback is not None:
+                progress_callback(done, total)
+
+        top = y * scale
+        is_last = row == len(ys) - 1
+        finished = band_h if is_last else ys[row + 1] * scale - top
+        blended = band[:finished] / band_weight[:finished]
+        output[top:top + finished] = np.rint(blended * 255.0).astype(np.uint8)
+
+        if not is_last:
+            keep = band_h - finished
+            band[:keep] = band[finished:]
+            band_weight[:keep] = band_weight[finished:]
+            band[keep:] = 0
+            band_weight[keep:] = 0
+
+    return output
+
+@timed("upscaling")
+def enhance_image(
+    image: Image.Image,
+    scale: int = 4,
+    tile_size: int | None = None,
+    tile_overlap: int | None = None,
+    tile_batch: int | None = None,
+    progress_callback=None,
+    alpha_mode: str | None = None,
+    alpha_mask: Image.Image | None = None,
+) -> Image.Image:
     if scale not in (2, 4):
         raise ValueError(f"Only scale=2 or scale=4 are supported. Got scale={scale}")
     
+    alpha_mode = alpha_mode or _ALPHA_UPSCALE_MODE
+    if alpha_mode not in _ALPHA_UPSCALE_MODES:
+        raise ValueError(
+            f"Unknown alpha mode: {alpha_mode}. Must be one of {', '.join(_ALPHA_UPSCALE_MODES)}"
+        )
+    
     model = _load_upscaler_model(scale=scale)
     
+    tile_size = _UPSCALE_TILE_SIZE if tile_size is None else tile_size
+    tile_overlap = _UPSCALE_TILE_OVERLAP if tile_overlap is None else tile_overlap
+    tile_batch = _UPSCALE_TILE_BATCH if tile_batch is None else tile_batch
+    
+    def upscale(array: np.ndarray, callback=None) -> np.ndarray:
+        return _upscale_array(
+            model,
+            array,
+            scale,
+            tile_size,
+            tile_overlap,
+            tile_batch=tile_batch,
+            progress_callback=callback,
+        )
+    
     if image.mode == "RGBA":
-        rgb_image = image.convert("RGB")
-        alpha_channel = np.array(image.split()[3], dtype=np.float32) / 255.0
+        rgb_array = np.array(image.convert("RGB"))
+        alpha_array = np.array(image.split()[3])
         
-        rgb_tensor = transforms.ToTensor()(rgb_image).unsqueeze(0).to(torch.device("cpu"))
+        if alpha_mode == "mask" and alpha_mask is None:
+            alpha_mode = "guided"
         
-        with torch.no_grad():
-            upscaled_rgb_tensor = model(rgb_tensor)
-        
-        upscaled_rgb = transforms.ToPILImage()(upscaled_rgb_tensor[0].clamp(0, 1))
-        
-        alpha_rgb = Image.merge("RGB", [
-            Image.fromarray((alpha_channel * 255).astype(np.uint8)),
-            Image.fromarray((alpha_channel * 255).astype(np.uint8)),
-            Image.fromarray((alpha_channel * 255).astype(np.uint8))
-        ])
-        alpha_tensor = transforms.ToTensor()(alpha_rgb).unsqueeze(0).to(torch.device("cpu"))
-        
-        with torch.no_grad():
-            upscaled_alpha_tensor = model(alpha_tensor)
-        
-        upscaled_alpha = transforms.ToPILImage()(upscaled_alpha_tensor[0].clamp(0, 1)).split()[0]
+        if alpha_mode == "model":
+            rgb_callback = alpha_callback = None
+            if progress_callback is not None:
+                rgb_callback = lambda done, total: progress_callback(done, total * 2)
+                alpha_callback = lambda done, total: progress_callback(total + done, total * 2)
+            
+            upscaled_rgb = upscale(rgb_array, rgb_callback)
+            
+            alpha_rgb = np.repeat(alpha_array[:, :, None], 3, axis=2)
+            upscaled_alpha = upscale(alpha_rgb, alpha_callback)[:, :, 0]
+        else:
+            upscaled_rgb = upscale(rgb_array, progress_callback)
+            if alpha_mode == "mask":
+                # Refine the raw prediction exactly like the cutout alpha, but
+                # against the upscaled image instead of the input.
+                upscaled_alpha = np.asarray(
+                    _full_resolution_alpha(Image.fromarray(upscaled_rgb), alpha_mask)
+                )
+            else:
+                upscaled_alpha = upscale_alpha(
+                    alpha_array, upscaled_rgb, mode="resize" if alpha_mode == "resize" else "guided"
+                )
         
-        upscaled_rgba = Image.merge("RGBA", [
-            upscaled_rgb.split()[0],
-            upscaled_rgb.split()[1],
-            upscaled_rgb.split()[2],
-            upscaled_alpha
-        ])
-        return upscaled_rgba
+        upscaled_rgba = np.dstack([upscaled_rgb, upscaled_alpha])
+        return Image.fromarray(upscaled_rgba)
     else:
-        rgb_image = image.convert("RGB")
-        rgb_tensor = transforms.ToTensor()(rgb_image).unsqueeze(0).to(torch.device("cpu"))
-        
-        with torch.no_grad():
-            upscaled_tensor = model(rgb_tensor)
+        rgb_array = np.array(image.convert("RGB"))
+        return Image.fromarray(upscale(rgb_array, progress_callback))
+
+def model_version() -> str:
+    return "|".join([
+        "birefnet=ZhengPeng7/BiRefNet",
+        "upscale2x=2xBHI_small_drct-xl",
+        "upscale4x=4xBHI_dat2_real",
+        f"alpha={_ALPHA_UPSCALE_MODE}",
+        f"tile={_UPSCALE_TILE_SIZE}/{_UPSCALE_TILE_OVERLAP}",
+        f"seg={_SEG_RESOLUTION}/{_SEG_FIT}",
+        f"refine={_MASK_REFINE and f'{_MASK_THRESHOLD}/{_MASK_REFINE_RADIUS}/{_MASK_REFINE_EPS}'}",
+        f"precision={precision_summary()}",
+        f"backend={backend_summary()}",
+    ])
+
+_MODES = ("remove_background", "enhance_2x", "enhance_4x", "advanced_2x", "advanced_4x")
+
+def _check_mode(mode: str) -> None:
+    if mode not in _MODES:
+        raise ValueError(
+            f"Unknown mode: {mode}. Must be 'remove_background', 'enhance_2x', "
+            "'enhance_4x', 'advanced_2x', or 'advanced_4x'"
+        )
+
+def models_for_mode(mode: str) -> list[str]:
+    _check_mode(mode)
+    names = []
+    if mode in ("remove_background", "advanced_2x", "advanced_4x"):
+        names.append(BIREFNET_MODEL)
+    if mode != "remove_background":
+        names.append(upscaler_model_name(int(mode[-2])))
+    return names
+
+def execution_backends(mode: str) -> str:
+    backends = []
+    for name in models_for_mode(mode):
+        model = registry.peek(name)
+        backend = model_backend(model) if model is not None else backend_for(name)
+        backends.append(f"{name}={backend}")
+    return ",".join(backends)
+
+_SEG_BATCH_SIZE = int(os.environ.get("AURORA_SEG_BATCH_SIZE", "1"))
+_SEG_BATCH_WAIT_MS = float(os.environ.get("AURORA_SEG_BATCH_WAIT_MS", "15"))
+
+def _segment(model, batch: torch.Tensor, device: torch.device) -> torch.Tensor:
+    precision = model_precision(model)
+    batch = prepare_input(batch.to(device), precision)
+    with torch.no_grad(), inference_context(precision, device):
+        return model(batch)[-1].float().sigmoid().cpu()
+
+def _predict_batch(tensors: list) -> list:
+    model, device, _ = get_model(None)
+    
+    if len(tensors) > 1:
+        print(f"Running batched background removal ({len(tensors)} images)...")
+    preds = _segment(model, torch.stack(tensors), device)
+    
+    return list(preds)
+
+_SEG_BATCHER = MicroBatcher(
+    _predict_batch,
+    max_batch=_SEG_BATCH_SIZE,
+    max_wait_ms=_SEG_BATCH_WAIT_MS,
+    name="segmentation-batcher",
+)
+
+_MASK_CACHE = ByteCache(
+    "mask",
+    max_bytes=int(float(os.environ.get("AURORA_MASK_CACHE_MB", "64")) * 1024 * 1024),
+    disk_dir=os.environ.get("AURORA_MASK_CACHE_DIR") or None,
+    disk_max_bytes=int(float(os.environ.get("AURORA_MASK_CACHE_DISK_MB", "512")) * 1024 * 1024),
+)
+_MASK_CACHE_COMPRESS = os.environ.get("AURORA_MASK_CACHE_COMPRESS", "1") != "0"
+
+def _mask_key(image: Image.Image, resolution: int) -> str:
+    return content_hash(
+        f"{image.mode}:{image.size[0]}x{image.size[1]}",
+        image.tobytes(),
+        f"birefnet:{precision_for(BIREFNET_MODEL)}:{resolution}:{_SEG_FIT}",
+    )
+
+def _pack_mask(mask: Image.Image) -> bytes:
+    data = mask.tobytes()
+    compressed = _MASK_CACHE_COMPRESS
+    if compressed:
+        data = zlib.compress(data, 1)
+    return struct.pack("<HH?", mask.size[0], mask.size[1], compressed) + data
+
+def _unpack_mask(packed: bytes) -> Image.Image:
+    width, height, compressed = struct.unpack_from("<HH?", packed)
+    data = packed[struct.calcsize("<HH?"):]
+    if compressed:
+        data = zlib.decompress(data)
+    return Image.frombytes("L", (width, height), data)
+
+def mask_cache_stats() -> dict:
+    return _MASK_CACHE.stats()
+
+def segmentation_batch_stats() -> dict:
+    return {"enabled": _SEG_BATCH_SIZE > 1, **_SEG_BATCHER.stats()}
+
+def preload_models(mode: str) -> None:
+    _check_mode(mode)
+    if mode in ("remove_background", "advanced_2x", "advanced_4x"):
+        get_model(None)
+    if mode.endswith("_2x"):
+        _load_upscaler_model(scale=2)
+    elif mode.endswith("_4x"):
+        _load_upscaler_model(scale=4)
+
+def segmentation_resolution(size: tuple[int, int], quality: str | int | None = None) -> int:
+    setting = str(quality or _SEG_RESOLUTION).strip().lower()
+    if setting in _SEG_QUALITY_PRESETS:
+        return _SEG_QUALITY_PRESETS[setting]
+    if setting == "auto":
+        longest = max(size)
+        return next((res for res in _SEG_RESOLUTIONS if longest <= res), _SEG_RESOLUTIONS[-1])
+    try:
+        resolution = int(setting)
+    except ValueError:
+        raise ValueError(
+            f"Unknown segmentation quality: {setting}. Must be 'auto', "
+            f"{', '.join(repr(name) for name in _SEG_QUALITY_PRESETS)} or a resolution in pixels"
+        )
+    if not _SEG_MIN_RESOLUTION <= resolution <= _SEG_MAX_RESOLUTION:
+        raise ValueError(
+            f"Segmentation resolution must be between {_SEG_MIN_RESOLUTION} and "
+            f"{_SEG_MAX_RESOLUTION} pixels. Got {resolution}"
+        )
+    return (resolution + 31) // 32 * 32
+
+def _segmentation_input(image: Image.Image, resolution: int, fit: str):
+    if fit == "stretch":
+        return _NORMALIZE(image.resize((resolution, resolution), Image.BILINEAR)), (0, 0, resolution, resolution)
+    
+    width, height = image.size
+    ratio = resolution / max(width, height)
+    inner = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+    left = (resolution - inner[0]) // 2
+    top = (resolution - inner[1]) // 2
+    canvas = Image.new("RGB", (resolution, resolution), _SEG_PAD_COLOR)
+    canvas.paste(image.resize(inner, Image.BILINEAR), (left, top))
+    return _NORMALIZE(canvas), (left, top, left + inner[0], top + inner[1])
+
+@timed("segmentation")
+def predict_mask(
+    image: Image.Image,
+    model_path: str | None = None,
+    quality: str | int | None = None,
+) -> Image.Image:
+    image = image.convert("RGB")
+    resolution = segmentation_resolution(image.size, quality)
+    if _SEG_FIT not in _SEG_FITS:
+        raise ValueError(f"Unknown segmentation fit: {_SEG_FIT}. Must be one of {', '.join(_SEG_FITS)}")
+    
+    key = _mask_key(image, resolution)
+    packed = _MASK_CACHE.get(key)
+    if packed is not None:
+        print("Reusing cached background removal mask")
+        return _unpack_mask(packed)
+    
+    get_model(model_path)
+    
+    input_tensor, box = _segmentation_input(image, resolution, _SEG_FIT)
+    
+    print(f"Running background removal at {resolution}px ({_SEG_FIT})...")
+    if _SEG_BATCH_SIZE > 1:
+        pred = _SEG_BATCHER.submit(input_tensor, key=tuple(input_tensor.shape))
+    else:
+        pred = _predict_batch([input_tensor])[0]
+    
+    left, top, right, bottom = box
+    pred = pred.squeeze()[top:bottom, left:right]
+    mask = Image.fromarray(pred.mul(255).byte().numpy())
+    _MASK_CACHE.put(key, _pack_mask(mask))
+    return mask
+
+def _full_resolution_alpha(image: Image.Image, mask: Image.Image) -> Image.Image:
+    if not _MASK_REFINE:
+        return mask.resize(image.size)
+    
+    radius = None if _MASK_REFINE_RADIUS == "auto" else int(_MASK_REFINE_RADIUS)
+    alpha = refine_mask(
+        np.asarray(mask.convert("L")),
+        np.asarray(image),
+        threshold=_MASK_THRESHOLD,
+        radius=radius,
+        eps=_MASK_REFINE_EPS,
+    )
+    return Image.fromarray(alpha)
+
+def remove_background_image(
+    image: Image.Image,
+    background: Image.Image | None = None,
+    model_path: str | None = None,
+    mask: Image.Image | None = None,
+    seg_quality: str | int | None = None,
+) -> Image.Image:
+    image = image.convert("RGB")
+    if mask is None:
+        mask = predict_mask(image, model_path, quality=seg_quality)
+    
+    with stage("compositing"):
+        image.putalpha(_full_resolution_alpha(image, mask))
         
-        upscaled = transforms.ToPILImage()(upscaled_tensor[0].clamp(0, 1))
-        return upscaled
+        if background is not None:
+            print("Compositing with background...")
+            image = replace_background(image, background)
+    
+    return image
+
+def run_pipeline(
+    image: Image.Image,
+    mode: str = "remove_background",
+    background: Image.Image | None = None,
+    model_path: str | None = None,
+    progress_callback=None,
+    seg_quality: str | int | None = None,
+) -> Image.Image:
+    _check_mode(mode)
+    
+    def report(stage: str, fraction: float) -> None:
+        if progress_callback is not None:
+            progress_callback(stage, fraction)
+    
+    def upscale_progress(done: int, total: int) -> None:
+        report("upscaling", done / total)
+    
+    if mode == "remove_background":
+        report("segmentation", 0.0)
+        result = remove_background_image(image, background, model_path, seg_quality=seg_quality)
+        report("segmentation", 1.0)
+        return result
+    
+    scale = 2 if mode.endswith("_2x") else 4
+    scale_name = "Balanced (2x)" if scale == 2 else "Strong (4x)"
+    
+    if mode.startswith("enhance"):
+        print(f"Enhancing image ({scale}x upscale, {scale_name})...")
+        report("upscaling", 0.0)
+        return enhance_image(image, scale=scale, progress_callback=upscale_progress)
+    
+    report("segmentation", 0.0)
+    mask = predict_mask(image, model_path, quality=seg_quality)
+    cutout = remove_background_image(image, background, model_path, mask=mask)
+    print(f"Enhancing image ({scale}x upscale, {scale_name})...")
+    report("upscaling", 0.0)
+    return enhance_image(cutout, scale=scale, alpha_mask=mask, progress_callback=upscale_progress)
 
 def process_image(
     input_path: str,
@@ -164,71 +573,62 @@ def process_image(
     mode: str = "remove_background",
     background_path: str | None = None,
     model_path: str | None = None,
+    output_format: str | None = None,
+    compression: str | None = None,
 ) -> None:
+    _check_mode(mode)
+    
     if mode == "remove_background":
-        _remove_background_only(input_path, output_path, model_path, background_path)
-    elif mode == "enhance_2x":
-        _enhance_only(input_path, output_path, scale=2)
-    elif mode == "enhance_4x":
-        _enhance_only(input_path, output_path, scale=4)
-    elif mode == "advanced_2x":
-        from backend.app.utils.temp_paths import make_temp_file, cleanup_paths
+        _remove_background_only(input_path, output_path, model_path, background_path, output_format, compression)
+    elif mode in ("enhance_2x", "enhance_4x"):
+        _enhance_only(
+            input_path, output_path, scale=2 if mode == "enhance_2x" else 4,
+            output_format=output_format, compression=compression,
+        )
+    else:
+        print(f"Loading image: {input_path}")
+        image = Image.open(input_path)
+        background = Image.open(background_path) if background_path else None
         
-        tmp_path = make_temp_file(suffix=".png")
-        try:
-            _remove_background_only(input_path, str(tmp_path), model_path, background_path)
-            _enhance_only(str(tmp_path), output_path, scale=2)
-        finally:
-            cleanup_paths(tmp_path)
-    elif mode == "advanced_4x":
-        from backend.app.utils.temp_paths import make_temp_file, cleanup_paths
+        result = run_pipeline(image, mode, background, model_path)
         
-        tmp_path = make_temp_file(suffix=".png")
-        try:
-            _remove_background_only(input_path, str(tmp_path), model_path, background_path)
-            _enhance_only(str(tmp_path), output_path, scale=4)
-        finally:
-            cleanup_paths(tmp_path)
-    else:
-        raise ValueError(
-            f"Unknown mode: {mode}. Must be 'remove_background', 'enhance_2x', "
-            "'enhance_4x', 'advanced_2x', or 'advanced_4x'"
-        )
+        save_result(result, output_path, output_format, compression)
+        print(f"✓ Saved enhanced image to: {output_path}")
+
+@timed("encode")
+def save_result(
+    image: Image.Image,
+    output_path: str | Path,
+    output_format: str | None = None,
+    compression: str | None = None,
+) -> str:
+    output_format = resolve_format(image, normalize_format(output_format) or format_for_path(output_path))
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        encode_image(image, output_format, compression, f)
+    return output_format
 
 def _remove_background_only(
     input_path: str,
     output_path: str,
     model_path: str | None = None,
     background_path: str | None = None,
+    output_format: str | None = None,
+    compression: str | None = None,
 ) -> None:
-    model, device, transform = get_model(model_path)
-    
-    print(f"Loading image: {input_path}")
-    image = Image.open(input_path).convert("RGB")
-    image_size = image.size
-    
-    input_tensor = transform(image).unsqueeze(0).to(device)
-    
-    print("Running background removal...")
-    with torch.no_grad():
-        preds = model(input_tensor)[-1].sigmoid().cpu()
-    
-    pred = preds[0].squeeze()
-    pred_pil = transforms.ToPILImage()(pred)
-    
-    mask = pred_pil.resize(image_size)
-    
-    image.putalpha(mask)
-    
+    background = None
     if background_path:
         if not os.path.exists(background_path):
             print(f"Error: Background image not found: {background_path}")
             return
-        print(f"Compositing with background: {background_path}")
-        image = replace_background(image, background_path)
+        background = Image.open(background_path)
     
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    image.save(output_path, format="PNG")
+    print(f"Loading image: {input_path}")
+    image = Image.open(input_path)
+    
+    image = remove_background_image(image, background, model_path)
+    
+    save_result(image, output_path, output_format, compression)
     
     if background_path:
         print(f"✓ Saved composite image to: {output_path}")
@@ -236,28 +636,16 @@ def _remove_background_only(
         print(f"✓ Saved transparent image to: {output_path}")
 
 def _load_flux_pipeline(quality: str = "fast", force_cpu: bool = False):
-    global _FLUX_PIPELINE_FAST, _FLUX_PIPELINE_HQ, _FLUX_PIPELINE_FAST_CPU, _FLUX_PIPELINE_HQ_CPU
+    if quality not in ("fast", "hq"):
+        raise ValueError(f"Quality must be 'fast' or 'hq'. Got: {quality}")
     
+    name = f"flux_{quality}_cpu" if force_cpu else f"flux_{quality}"
+    return registry.get(name, lambda: _build_flux_pipeline(quality, force_cpu))
+
+def _build_flux_pipeline(quality: str, force_cpu: bool):
     use_cuda = torch.cuda.is_available() and not force_cpu
     device = torch.device("cuda" if use_cuda else "cpu")
     
-    if quality == "fast":
-        if force_cpu:
-            if _FLUX_PIPELINE_FAST_CPU is not None:
-                return _FLUX_PIPELINE_FAST_CPU
-        else:
-            if _FLUX_PIPELINE_FAST is not None:
-                return _FLUX_PIPELINE_FAST
-    elif quality == "hq":
-        if force_cpu:
-            if _FLUX_PIPELINE_HQ_CPU is not None:
-                return _FLUX_PIPELINE_HQ_CPU
-        else:
-            if _FLUX_PIPELINE_HQ is not None:
-                return _FLUX_PIPELINE_HQ
-    else:
-        raise ValueError(f"Quality must be 'fast' or 'hq'. Got: {quality}")
-    
     try:
         from diffusers import FluxPipeline
     except ImportError:
@@ -289,17 +677,6 @@ def _load_flux_pipeline(quality: str = "fast", force_cpu: bool = False):
         
         print(f"✓ {quality_name} pipeline loaded successfully on {device}")
         
-        if quality == "fast":
-            if force_cpu:
-                _FLUX_PIPELINE_FAST_CPU = pipeline
-            else:
-                _FLUX_PIPELINE_FAST = pipeline
-        else:
-            if force_cpu:
-                _FLUX_PIPELINE_HQ_CPU = pipeline
-            else:
-                _FLUX_PIPELINE_HQ = pipeline
-        
         return pipeline
         
     except RuntimeError as e:
@@ -321,11 +698,6 @@ def _load_flux_pipeline(quality: str = "fast", force_cpu: bool = False):
                 
                 print(f"✓ {quality_name} pipeline loaded on CPU (GPU fallback)")
                 
-                if quality == "fast":
-                    _FLUX_PIPELINE_FAST_CPU = pipeline
-                else:
-                    _FLUX_PIPELINE_HQ_CPU = pipeline
-                
                 return pipeline
             except Exception as fallback_error:
                 raise RuntimeError(
@@ -354,32 +726,42 @@ def _load_flux_pipeline(quality: str = "fast", force_cpu: bool = False):
             "Please check your internet connection and try again."
         ) from e
 
-def generate_background(prompt: str, quality: str = "fast", provider_pref: str = "lcm") -> tuple[Image.Image, dict]:
+def generate_background(
+    prompt: str,
+    quality: str = "fast",
+    provider_pref: str = "lcm",
+    seed: int | None = None,
+) -> tuple[Image.Image, dict]:
     if not prompt or not prompt.strip():
         raise ValueError("Prompt cannot be empty")
 
     if quality not in ("fast", "hq"):
         raise ValueError(f"Quality must be 'fast' or 'hq'. Got: {quality}")
 
-    return bg_providers.generate_background(prompt=prompt, quality=quality, provider_pref=provider_pref)
+    return bg_providers.generate_background(
+        prompt=prompt, quality=quality, provider_pref=provider_pref, seed=seed
+    )
 
 
-def _enhance_only(input_path: str, output_path: str, scale: int = 4) -> None:
+def _enhance_only(
+    input_path: str,
+    output_path: str,
+    scale: int = 4,
+    output_format: str | None = None,
+    compression: str | None = None,
+) -> None:
     print(f"Loading image: {input_path}")
     try:
         image = Image.open(input_path)
     except Exception as e:
         raise RuntimeError(f"Failed to load image from {input_path}: {str(e)}") from e
     
-    scale_name = "Balanced (2x)" if scale == 2 else "Strong (4x)"
-    print(f"Enhancing image ({scale}x upscale, {scale_name})...")
     try:
-        enhanced = enhance_image(image, scale=scale)
+        enhanced = run_pipeline(image, mode=f"enhance_{scale}x")
     except Exception as e:
         raise RuntimeError(f"Failed to enhance image: {str(e)}") from e
     
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    enhanced.save(output_path, format="PNG")
+    save_result(enhanced, output_path, output_format, compression)
     print(f"✓ Saved enhanced image to: {output_path}")
 
 def remove_background(
@@ -390,7 +772,7 @@ def remove_background(
     upscale: bool = False,
 ) -> None:
     if upscale:
-        process_image(input_path, output_path, mode="advanced", background_path=background_path, model_path=model_path)
+        process_image(input_path, output_path, mode="advanced_4x", background_path=background_path, model_path=model_path)
     else:
         _remove_background_only(input_path, output_path, model_path, background_path)
 
@@ -404,31 +786,83 @@ Examples:
   python src/inference.py data/input/photo.jpg data/output/photo.png --background bg.jpg
   python src/inference.py data/input/photo.jpg data/output/photo.png --upscale
   python src/inference.py data/input/photo.jpg data/output/photo.png --background bg.jpg --upscale
+
+Batch mode (input is a directory, a quoted glob or a manifest with one path per line):
+  python src/inference.py data/input/ data/output/ --mode advanced_2x --workers 2
+  python src/inference.py "catalogue/**/*.jpg" data/output/ --recursive
+  python src/inference.py manifest.txt data/output/ --mode enhance_4x
         """
     )
     
-    parser.add_argument('input', help='Path to input image')
-    parser.add_argument('output', help='Path to output image')
+    parser.add_argument('input', help='Path to input image, directory, glob or manifest file')
+    parser.add_argument('output', help='Path to output image (output directory in batch mode)')
     parser.add_argument('--model', '-m', default=None, 
                        help='Path to model weights (ignored, uses Hugging Face model)')
     parser.add_argument('--background', '-b', default=None,
                        help='Path to background image for replacement')
     parser.add_argument('--upscale', '-u', action='store_true',
                        help='Upscale image by 4x using AI enhancement')
+    parser.add_argument('--mode', default=None, choices=_MODES,
+                       help='Processing mode (defaults to remove_background, or advanced_4x with --upscale)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Batch mode: concurrent inference workers (models are shared)')
+    parser.add_argument('--io-workers', type=int, default=4,
+                       help='Batch mode: threads for decoding and encoding')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                       help='Batch mode: descend into subdirectories / expand ** globs')
+    parser.add_argument('--overwrite', action='store_true',
+                       help='Batch mode: reprocess images whose output already exists')
+    parser.add_argument('--format', '-f', default=None, choices=OUTPUT_FORMATS,
+                       help='Output format (defaults to the output file extension, or png in batch mode)')
+    parser.add_argument('--compression', '-c', default=None,
+                       help='Encoder setting: fast, default, best, lossless (webp) or a number '
+                            '(png zlib level 0-9, webp/jpeg quality 1-100)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Single image: record a cProfile/tracemalloc profile of the run')
     
     args = parser.parse_args()
+    mode = args.mode or ("advanced_4x" if args.upscale else "remove_background")
+    
+    from backend.app.services import batch
+    
+    if batch.is_batch_source(args.input):
+        inputs, input_root = batch.collect_inputs(args.input, recursive=args.recursive)
+        if not inputs:
+            print(f"Error: No input images found for: {args.input}")
+            sys.exit(1)
+        summary = batch.run_batch(
+            inputs,
+            input_root,
+            args.output,
+            mode=mode,
+            background_path=args.background,
+            workers=args.workers,
+            io_workers=args.io_workers,
+            overwrite=args.overwrite,
+            output_format=args.format,
+            compression=args.compression,
+        )
+        sys.exit(1 if summary["failed"] else 0)
     
     if not os.path.exists(args.input):
         print(f"Error: Input file not found: {args.input}")
         sys.exit(1)
     
-    remove_background(
-        args.input, 
-        args.output, 
-        model_path=args.model,
-        background_path=args.background,
-        upscale=args.upscale,
-    )
+    session = profiling.start(f"cli {mode}") if args.profile else None
+    try:
+        profiling.call(
+            process_image,
+            args.input,
+            args.output,
+            mode=mode,
+            background_path=args.background,
+            model_path=args.model,
+            output_format=args.format,
+            compression=args.compression,
+        )
+    finally:
+        if session is not None:
+            profiling.finish(session, mode=mode, input=args.input)
 
 if __name__ == "__main__":
     main()
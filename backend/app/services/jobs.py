@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobStoreFullError(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, mode: str, filename: str | None) -> None:
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.filename = filename
+        self.status = QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished_at: float | None = None
+        self.result: bytes | None = None
+        self.media_type = "image/png"
+        self.headers: Dict[str, str] = {}
+        self.provider_info: Dict[str, Any] | None = None
+        self.task = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def set_stage(self, stage: str, progress: float = 0.0) -> None:
+        self.status = RUNNING
+        self.stage = stage
+        self.progress = round(min(max(progress, 0.0), 1.0), 4)
+        self.updated_at = time.time()
+
+    def succeed(self, result: bytes, media_type: str, headers: Dict[str, str], provider_info: Dict[str, Any] | None) -> None:
+        self.result = result
+        self.media_type = media_type
+        self.headers = headers
+        self.provider_info = provider_info
+        self.status = SUCCEEDED
+        self.stage = "done"
+        self.progress = 1.0
+        self.finished_at = self.updated_at = time.time()
+
+    def fail(self, error: str) -> None:
+        self.error = error
+        self.status = FAILED
+        self.finished_at = self.updated_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            "finishedAt": self.finished_at,
+            "provider": self.provider_info,
+            "resultUrl": f"/jobs/{self.id}/result" if self.status == SUCCEEDED else None,
+        }
+
+
+class JobStore:
+    def __init__(self, max_jobs: int, ttl_seconds: float) -> None:
+        self.max_jobs = max(1, max_jobs)
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self) -> None:
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def create(self, mode: str, filename: str | None) -> Job:
+        with self._lock:
+            self._evict_expired()
+            if len(self._jobs) >= self.max_jobs:
+                oldest_finished = next((job_id for job_id, job in self._jobs.items() if job.finished), None)
+                if oldest_finished is None:
+                    raise JobStoreFullError(
+                        f"Too many jobs in progress ({len(self._jobs)}). Please try again shortly."
+                    )
+                del self._jobs[oldest_finished]
+            job = Job(mode, filename)
+            self._jobs[job.id] = job
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+
+job_store = JobStore(
+    max_jobs=int(os.environ.get("AURORA_MAX_JOBS", "100")),
+    ttl_seconds=float(os.environ.get("AURORA_JOB_TTL_SECONDS", "600")),
+)
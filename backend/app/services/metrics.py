@@ -0,0 +1,246 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import os
+import resource
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from backend.app.services import profiling
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = _DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(round(total, 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: Dict[tuple, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[tuple(str(labels[name]) for name in self.labels)] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "aurora_stage_seconds", "Time spent in each processing stage", ("stage", "mode", "provider")
+)
+REQUEST_SECONDS = Histogram(
+    "aurora_request_seconds", "Total time to produce and encode a result", ("mode", "provider", "cache")
+)
+COALESCED = Counter(
+    "aurora_coalesced_total", "Requests that waited on an identical in-flight computation instead of running it", ("kind",)
+)
+MODEL_LOAD_SECONDS = Histogram("aurora_model_load_seconds", "Time to load each model", ("model",))
+REQUESTS = Counter("aurora_requests_total", "Results produced", ("mode", "provider", "cache"))
+
+_collectors: List[Callable[[], Iterable[Gauge | Counter]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[Gauge | Counter]]) -> None:
+    _collectors.append(collector)
+
+
+class RequestTimer:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self, include_total: bool = True) -> str:
+        with self._lock:
+            stages = list(self.stages.items())
+        parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages]
+        if include_total:
+            parts.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current_timer: "contextvars.ContextVar[RequestTimer | None]" = contextvars.ContextVar(
+    "aurora_request_timer", default=None
+)
+
+
+def start_request() -> RequestTimer:
+    timer = RequestTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    timer = _current_timer.get()
+    session = profiling.current()
+    if timer is None and session is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if timer is not None:
+            timer.add(name, seconds)
+        if session is not None:
+            session.mark(name, start, seconds)
+
+
+def timed(name: str):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe_request(timer: RequestTimer, mode: str, provider: str | None, cache: str) -> None:
+    provider = provider or "none"
+    with timer._lock:
+        stages = list(timer.stages.items())
+    for name, seconds in stages:
+        STAGE_SECONDS.observe(seconds, stage=name, mode=mode, provider=provider)
+    REQUEST_SECONDS.observe(timer.elapsed(), mode=mode, provider=provider, cache=cache)
+    REQUESTS.inc(mode=mode, provider=provider, cache=cache)
+
+
+def _process_metrics() -> Iterable[Gauge]:
+    peak = Gauge("aurora_peak_rss_bytes", "Peak resident set size of the server process")
+    peak.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    rss = Gauge("aurora_rss_bytes", "Current resident set size of the server process")
+    try:
+        with open("/proc/self/statm", "r") as f:
+            rss.set(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError):
+        pass
+    pss = Gauge("aurora_pss_bytes", "Proportional set size: resident memory with pages shared between workers split evenly")
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss.set(int(line.split()[1]) * 1024)
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    return [peak, rss, pss]
+
+
+register_collector(_process_metrics)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in (STAGE_SECONDS, REQUEST_SECONDS, REQUESTS, COALESCED, MODEL_LOAD_SECONDS):
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            metrics = list(collector())
+        except Exception as exc:
+            print(f"✗ metrics collector {getattr(collector, '__name__', collector)} failed: {exc}")
+            continue
+        for metric in metrics:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,227 @@
+import gc
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from backend.app.services.metrics import MODEL_LOAD_SECONDS
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _module_bytes(module: Any, seen: set) -> int:
+    total = 0
+    tensors = []
+    if hasattr(module, "parameters"):
+        tensors.extend(module.parameters())
+    if hasattr(module, "buffers"):
+        tensors.extend(module.buffers())
+    for tensor in tensors:
+        try:
+            storage = tensor.untyped_storage()
+            key = storage.data_ptr()
+            if key in seen:
+                continue
+            seen.add(key)
+            total += storage.nbytes()
+        except Exception:
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def estimate_model_bytes(obj: Any) -> int:
+    seen: set = set()
+    if hasattr(obj, "parameters") and callable(obj.parameters):
+        return _module_bytes(obj, seen)
+    components = getattr(obj, "components", None)
+    if isinstance(components, dict):
+        return sum(
+            _module_bytes(component, seen)
+            for component in components.values()
+            if hasattr(component, "parameters") and callable(component.parameters)
+        )
+    return 0
+
+
+class _Entry:
+    def __init__(self, name: str, loader: Callable[[], Any], pinned: bool) -> None:
+        self.name = name
+        self.loader = loader
+        self.pinned = pinned
+        self.model: Any = None
+        self.bytes = 0
+        self.load_seconds: float | None = None
+        self.loads = 0
+        self.last_used: float | None = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self, budget_bytes: int = 0, pinned: Optional[set] = None) -> None:
+        self.budget_bytes = max(0, budget_bytes)
+        self._pinned_names = set(pinned or ())
+        self._entries: Dict[str, _Entry] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def register(self, name: str, loader: Callable[[], Any], pinned: bool = False) -> None:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self._entries[name] = _Entry(name, loader, pinned or name in self._pinned_names)
+            else:
+                entry.loader = loader
+                entry.pinned = entry.pinned or pinned
+
+    def _entry(self, name: str, loader: Optional[Callable[[], Any]]) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                return entry
+        if loader is None:
+            raise KeyError(f"Unknown model: {name}")
+        self.register(name, loader)
+        return self._entries[name]
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        entry = self._entry(name, loader)
+
+        model = entry.model
+        if model is None:
+            with entry.lock:
+                model = entry.model
+                if model is None:
+                    model = self._load(entry)
+
+        with self._lock:
+            entry.last_used = time.time()
+            self._lru[name] = None
+            self._lru.move_to_end(name)
+        return model
+
+    def _load(self, entry: _Entry) -> Any:
+        rss_before = _rss_bytes()
+        start = time.monotonic()
+        model = entry.loader()
+        elapsed = time.monotonic() - start
+
+        size = estimate_model_bytes(model) or max(0, _rss_bytes() - rss_before)
+        with self._lock:
+            entry.model = model
+            entry.bytes = size
+            entry.load_seconds = round(elapsed, 3)
+            entry.loads += 1
+        MODEL_LOAD_SECONDS.observe(elapsed, model=entry.name)
+        print(f"Model registry: loaded {entry.name} (~{size / 1024 / 1024:.0f} MB) in {elapsed:.2f}s")
+
+        self._enforce_budget(keep=entry.name)
+        return model
+
+    def loaded_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.bytes for entry in self._entries.values() if entry.model is not None)
+
+    def _enforce_budget(self, keep: str | None = None) -> None:
+        if not self.budget_bytes:
+            return
+        while True:
+            with self._lock:
+                total = sum(entry.bytes for entry in self._entries.values() if entry.model is not None)
+                if total <= self.budget_bytes:
+                    return
+                victim = next(
+                    (
+                        name for name in self._lru
+                        if name != keep
+                        and self._entries[name].model is not None
+                        and not self._entries[name].pinned
+                    ),
+                    None,
+                )
+            if victim is None:
+                print(
+                    f"Model registry: {total / 1024 / 1024:.0f} MB loaded exceeds the "
+                    f"{self.budget_bytes / 1024 / 1024:.0f} MB budget but nothing is evictable"
+                )
+                return
+            self.evict(victim)
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.model is None:
+                return False
+            entry.model = None
+            self._lru.pop(name, None)
+            self.evictions += 1
+            freed = entry.bytes
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        print(f"Model registry: evicted {name} (~{freed / 1024 / 1024:.0f} MB)")
+        return True
+
+    def pin(self, name: str) -> None:
+        with self._lock:
+            self._pinned_names.add(name)
+            if name in self._entries:
+                self._entries[name].pinned = True
+
+    def unpin(self, name: str) -> None:
+        with self._lock:
+            self._pinned_names.discard(name)
+            if name in self._entries:
+                self._entries[name].pinned = False
+        self._enforce_budget()
+
+    def peek(self, name: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.model if entry is not None else None
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry is not None and entry.model is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {
+                name: {
+                    "loaded": entry.model is not None,
+                    "pinned": entry.pinned,
+                    "approxBytes": entry.bytes,
+                    "loadSeconds": entry.load_seconds,
+                    "loads": entry.loads,
+                    "lastUsed": entry.last_used,
+                }
+                for name, entry in self._entries.items()
+            }
+            loaded = sum(entry.bytes for entry in self._entries.values() if entry.model is not None)
+        return {
+            "budgetBytes": self.budget_bytes,
+            "loadedBytes": loaded,
+            "rssBytes": _rss_bytes(),
+            "evictions": self.evictions,
+            "models": models,
+        }
+
+
+registry = ModelRegistry(
+    budget_bytes=int(float(os.environ.get("AURORA_MODEL_MEMORY_BUDGET_MB", "0")) * 1024 * 1024),
+    pinned={
+        name.strip()
+        for name in os.environ.get("AURORA_PINNED_MODELS", "birefnet").split(",")
+        if name.strip()
+    },
+)
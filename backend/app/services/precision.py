@@ -0,0 +1,113 @@
+import contextlib
+import os
+from pathlib import Path
+from typing import Dict
+
+import torch
+
+FP32 = "fp32"
+BF16 = "bf16"
+INT8 = "int8"
+CHANNELS_LAST = "channels_last"
+
+PRECISION_MODES = (FP32, BF16, INT8, CHANNELS_LAST)
+
+_bf16_supported: bool | None = None
+
+
+def _parse_precision(spec: str) -> tuple[str, Dict[str, str]]:
+    default = FP32
+    overrides: Dict[str, str] = {}
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, mode = part.rpartition("=")
+        if mode not in PRECISION_MODES:
+            raise ValueError(
+                f"Unknown precision mode: {mode}. Must be one of {', '.join(PRECISION_MODES)}"
+            )
+        if name:
+            overrides[name] = mode
+        else:
+            default = mode
+    return default, overrides
+
+
+_DEFAULT_PRECISION, _MODEL_PRECISION = _parse_precision(os.environ.get("AURORA_PRECISION", FP32))
+
+
+def precision_for(model_name: str) -> str:
+    return _MODEL_PRECISION.get(model_name, _DEFAULT_PRECISION)
+
+
+def precision_summary() -> str:
+    parts = [_DEFAULT_PRECISION]
+    parts.extend(f"{name}={mode}" for name, mode in sorted(_MODEL_PRECISION.items()))
+    return ",".join(parts)
+
+
+def bf16_supported(device: torch.device) -> bool:
+    global _bf16_supported
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    if _bf16_supported is None:
+        try:
+            flags = Path("/proc/cpuinfo").read_text(encoding="utf-8", errors="ignore")
+            _bf16_supported = "avx512_bf16" in flags or "amx_bf16" in flags
+        except OSError:
+            _bf16_supported = False
+        if not _bf16_supported:
+            try:
+                _bf16_supported = bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+            except (AttributeError, RuntimeError):
+                pass
+    return _bf16_supported
+
+
+def _module(model) -> torch.nn.Module:
+    return model if isinstance(model, torch.nn.Module) else model.model
+
+
+def resolve_precision(mode: str, model, device: torch.device) -> str:
+    if mode == BF16:
+        if not bf16_supported(device):
+            print("bf16 requested but not supported natively on this device; using fp32")
+            return FP32
+        if not getattr(model, "supports_bfloat16", True):
+            print("bf16 requested but the model architecture does not support it; using fp32")
+            return FP32
+    if mode == INT8:
+        if device.type != "cpu":
+            print("int8 dynamic quantization is CPU-only; using fp32")
+            return FP32
+        if not any(isinstance(module, torch.nn.Linear) for module in _module(model).modules()):
+            print("int8 requested but the model has no Linear layers to quantize; using fp32")
+            return FP32
+    return mode
+
+
+def prepare_model(model, mode: str):
+    module = _module(model)
+    if mode == INT8:
+        torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    elif mode == CHANNELS_LAST:
+        module.to(memory_format=torch.channels_last)
+    model.aurora_precision = mode
+    return model
+
+
+def model_precision(model) -> str:
+    return getattr(model, "aurora_precision", FP32)
+
+
+def prepare_input(tensor: torch.Tensor, mode: str) -> torch.Tensor:
+    if mode == CHANNELS_LAST and tensor.dim() == 4:
+        return tensor.contiguous(memory_format=torch.channels_last)
+    return tensor
+
+
+def inference_context(mode: str, device: torch.device):
+    if mode == BF16:
+        return torch.autocast(device_type=device.type, dtype=torch.bfloat16)
+    return contextlib.nullcontext()
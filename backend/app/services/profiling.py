@@ -0,0 +1,226 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.app.utils.temp_paths import temp_dir
+
+ENABLED = os.environ.get("AURORA_PROFILING", "0") == "1"
+PROFILE_DIR = Path(os.environ.get("AURORA_PROFILE_DIR") or temp_dir() / "aurora-profiles")
+PROFILE_KEEP = int(os.environ.get("AURORA_PROFILE_KEEP", "20"))
+TRACEMALLOC_FRAMES = int(os.environ.get("AURORA_PROFILE_TRACEMALLOC_FRAMES", "1"))
+_ABANDON_SECONDS = 900
+_TOP_FUNCTIONS = 40
+_TOP_ALLOCATIONS = 25
+
+
+class ProfileSession:
+    def __init__(self, label: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.created_at = time.time()
+        self.start = time.perf_counter()
+        self.stages: List[Dict[str, Any]] = []
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._owns_tracemalloc = False
+        self.finished = False
+
+    @property
+    def url(self) -> str:
+        return f"/profiles/{self.id}"
+
+    def call(self, fn, *args, **kwargs):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def mark(self, stage: str, start: float, seconds: float) -> None:
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        with self._lock:
+            self.stages.append({
+                "stage": stage,
+                "thread": threading.current_thread().name,
+                "startMs": round((start - self.start) * 1000, 2),
+                "durationMs": round(seconds * 1000, 2),
+                "tracedBytes": traced,
+                "tracedPeakBytes": peak,
+            })
+
+    def _function_stats(self, path: Path) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return []
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(str(path))
+
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "ownSeconds": round(own, 6),
+                "cumulativeSeconds": round(cumulative, 6),
+            })
+        rows.sort(key=lambda row: row["cumulativeSeconds"], reverse=True)
+        return rows[:_TOP_FUNCTIONS]
+
+    def _allocation_stats(self) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            return {}
+        snapshot = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        top = snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]
+        return {
+            "tracedBytes": traced,
+            "peakBytes": peak,
+            "top": [
+                {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                for stat in top
+            ],
+        }
+
+    def finish(self, **info: Any) -> Path:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stats_path = PROFILE_DIR / f"{self.id}.prof"
+        summary = {
+            "id": self.id,
+            "label": self.label,
+            "createdAt": self.created_at,
+            "totalMs": round((time.perf_counter() - self.start) * 1000, 2),
+            **info,
+            "stages": sorted(self.stages, key=lambda stage: stage["startMs"]),
+            "functions": self._function_stats(stats_path),
+            "allocations": self._allocation_stats(),
+            "pstats": f"{self.url}?format=pstats" if stats_path.exists() else None,
+        }
+        summary_path = PROFILE_DIR / f"{self.id}.json"
+        summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return summary_path
+
+
+_current_session: "contextvars.ContextVar[ProfileSession | None]" = contextvars.ContextVar(
+    "aurora_profile_session", default=None
+)
+_active: Optional[ProfileSession] = None
+_active_lock = threading.Lock()
+
+
+def start(label: str) -> Optional[ProfileSession]:
+    global _active
+    with _active_lock:
+        previous = _active
+        if previous is not None and time.time() - previous.created_at < _ABANDON_SECONDS:
+            return None
+        session = _active = ProfileSession(label)
+        if previous is not None:
+            # The previous profile was never finished; take over the
+            # tracemalloc session it started so it still gets stopped.
+            previous.finished = True
+            session._owns_tracemalloc = previous._owns_tracemalloc
+            previous._owns_tracemalloc = False
+    if previous is not None:
+        print(f"✗ Profile {previous.id} was abandoned; replaced by {session.id}")
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        session._owns_tracemalloc = True
+    else:
+        tracemalloc.reset_peak()
+    _current_session.set(session)
+    print(f"Profiling request {session.id} ({label})")
+    return session
+
+
+def finish(session: ProfileSession, **info: Any) -> None:
+    global _active
+    with _active_lock:
+        if session.finished:
+            return
+        session.finished = True
+    try:
+        path = session.finish(**info)
+        print(f"✓ Profile {session.id} written to {path}")
+    except Exception as exc:
+        print(f"✗ Failed to write profile {session.id}: {type(exc).__name__}: {exc}")
+    finally:
+        if session._owns_tracemalloc:
+            tracemalloc.stop()
+        with _active_lock:
+            if _active is session:
+                _active = None
+        _prune()
+
+
+def current() -> Optional[ProfileSession]:
+    session = _current_session.get()
+    return session if session is not None and not session.finished else None
+
+
+def call(fn, *args, **kwargs):
+    session = current()
+    if session is None:
+        return fn(*args, **kwargs)
+    return session.call(fn, *args, **kwargs)
+
+
+def _prune() -> None:
+    try:
+        summaries = sorted(PROFILE_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for path in summaries[PROFILE_KEEP:]:
+        for stale in (path, path.with_suffix(".prof")):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def _valid_id(profile_id: str) -> bool:
+    return len(profile_id) == 32 and profile_id.isalnum()
+
+
+def summary_path(profile_id: str) -> Optional[Path]:
+    path = PROFILE_DIR / f"{profile_id}.json"
+    return path if _valid_id(profile_id) and path.exists() else None
+
+
+def pstats_path(profile_id: str) -> Optional[Path]:
+    path = PROFILE_DIR / f"{profile_id}.prof"
+    return path if _valid_id(profile_id) and path.exists() else None
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    profiles = []
+    try:
+        paths = sorted(PROFILE_DIR.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    except OSError:
+        return profiles
+    for path in paths:
+        try:
+            summary = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        profiles.append({
+            key: summary.get(key) for key in ("id", "label", "createdAt", "totalMs", "mode", "status")
+        } | {"url": f"/profiles/{summary.get('id')}"})
+    return profiles
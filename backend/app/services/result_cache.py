@@ -0,0 +1,35 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app.services.cache import ByteCache, content_hash, pack_entry, unpack_entry
+
+_MB = 1024 * 1024
+
+result_cache = ByteCache(
+    "result",
+    max_bytes=int(float(os.environ.get("AURORA_RESULT_CACHE_MB", "256")) * _MB),
+    disk_dir=os.environ.get("AURORA_RESULT_CACHE_DIR") or None,
+    disk_max_bytes=int(float(os.environ.get("AURORA_RESULT_CACHE_DISK_MB", "2048")) * _MB),
+    max_item_bytes=int(float(os.environ.get("AURORA_RESULT_CACHE_MAX_ITEM_MB", "64")) * _MB),
+)
+
+
+def result_key(contents: bytes, mode: str, background_key: str | None, model_version: str) -> str:
+    return content_hash(contents, mode, background_key, model_version)
+
+
+def output_key(key: str, output: str = "png") -> str:
+    return f"{key}|{output}"
+
+
+def get_result(key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    packed = result_cache.get(key)
+    if packed is None:
+        return None
+    return unpack_entry(packed)
+
+
+def put_result(key: str, payload: bytes, meta: Dict[str, Any]) -> None:
+    if len(payload) > result_cache.max_item_bytes:
+        return
+    result_cache.put(key, pack_entry(payload, meta))
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.app.utils.temp_paths import temp_dir
+
+_MB = 1024 * 1024
+
+
+class StoredResult:
+    def __init__(
+        self,
+        result_id: str,
+        payload: bytes | None,
+        media_type: str,
+        filename: str,
+        headers: Dict[str, str],
+        created_at: float,
+        size: int,
+        path: Path | None = None,
+    ) -> None:
+        self.id = result_id
+        self.payload = payload
+        self.media_type = media_type
+        self.filename = filename
+        self.headers = headers
+        self.created_at = created_at
+        self.size = size
+        self.path = path
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.id}"'
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "mediaType": self.media_type,
+            "filename": self.filename,
+            "headers": self.headers,
+            "createdAt": self.created_at,
+        }
+
+
+class ResultStore:
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        disk_dir: str | Path | None = None,
+        disk_max_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir and disk_max_bytes > 0 else None
+        self.disk_max_bytes = max(0, disk_max_bytes)
+        self._entries: "OrderedDict[str, StoredResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.spilled = 0
+        self.dropped = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_paths(self, result_id: str) -> tuple[Path, Path]:
+        return self.disk_dir / f"{result_id}.bin", self.disk_dir / f"{result_id}.json"
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds
+
+    def remaining_seconds(self, result: StoredResult) -> int:
+        return max(0, int(self.ttl_seconds - (time.time() - result.created_at)))
+
+    def _evict_expired(self, now: float) -> None:
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if not self._expired(oldest.created_at, now):
+                break
+            self._entries.popitem(last=False)
+            self._bytes -= oldest.size
+
+    def _spill(self, result: StoredResult) -> bool:
+        if self.disk_dir is None or result.size > self.disk_max_bytes:
+            return False
+        path, meta_path = self._disk_paths(result.id)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(result.payload)
+            os.replace(tmp_path, path)
+            meta_path.write_text(json.dumps(result.meta()), encoding="utf-8")
+        except OSError as exc:
+            print(f"result store: failed to write {path.name}: {exc}")
+            for stale in (tmp_path, path):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+            return False
+        self.spilled += 1
+        self._prune_disk()
+        return True
+
+    def _prune_disk(self) -> None:
+        now = time.time()
+        try:
+            files = [(path, path.stat()) for path in self.disk_dir.glob("*.bin")]
+        except OSError:
+            return
+        total = sum(stat.st_size for _, stat in files)
+        for path, stat in sorted(files, key=lambda item: item[1].st_mtime):
+            if not self._expired(stat.st_mtime, now) and total <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink()
+                path.with_suffix(".json").unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= stat.st_size
+
+    def put(self, payload: bytes, media_type: str, filename: str, headers: Dict[str, str]) -> str:
+        result = StoredResult(
+            uuid.uuid4().hex, payload, media_type, filename, dict(headers), time.time(), len(payload)
+        )
+        overflow = []
+        with self._lock:
+            self.stored += 1
+            self._evict_expired(result.created_at)
+            self._entries[result.id] = result
+            self._bytes += result.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                overflow.append(evicted)
+
+        for evicted in overflow:
+            if not self._spill(evicted):
+                self.dropped += 1
+        return result.id
+
+    def get(self, result_id: str) -> Optional[StoredResult]:
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            result = self._entries.get(result_id)
+        if result is not None:
+            return result
+
+        if self.disk_dir is None or not result_id.isalnum():
+            return None
+        path, meta_path = self._disk_paths(result_id)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            size = path.stat().st_size
+        except (OSError, ValueError):
+            return None
+        if self._expired(meta["createdAt"], now):
+            return None
+        return StoredResult(
+            result_id, None, meta["mediaType"], meta["filename"], meta["headers"], meta["createdAt"],
+            size, path=path,
+        )
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "ttlSeconds": self.ttl_seconds,
+                "stored": self.stored,
+                "spilled": self.spilled,
+                "dropped": self.dropped,
+                "diskDir": str(self.disk_dir) if self.disk_dir else None,
+            }
+
+
+result_store = ResultStore(
+    max_bytes=int(float(os.environ.get("AURORA_RESULT_STORE_MB", "128")) * _MB),
+    ttl_seconds=float(os.environ.get("AURORA_RESULT_TTL_SECONDS", "600")),
+    disk_dir=os.environ.get("AURORA_RESULT_STORE_DIR") or temp_dir() / "aurora-results",
+    disk_max_bytes=int(float(os.environ.get("AURORA_RESULT_STORE_DISK_MB", "1024")) * _MB),
+)
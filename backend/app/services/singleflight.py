@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+from backend.app.services.metrics import COALESCED
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            COALESCED.inc(kind=self.name)
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class ThreadSingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def run(self, key: str, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            shared = future is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                self.leaders += 1
+                future = self._inflight[key] = Future()
+        if shared:
+            COALESCED.inc(kind=self.name)
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"inflight": len(self._inflight), "leaders": self.leaders, "coalesced": self.coalesced}
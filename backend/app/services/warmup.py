@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from backend.app.services.model_registry import registry
+
+_WARMUP_ENABLED = os.environ.get("AURORA_WARMUP", "1").strip().lower() not in ("0", "false", "no", "off")
+_WARMUP_MODES = [
+    mode.strip()
+    for mode in os.environ.get("AURORA_WARMUP_MODES", "remove_background").split(",")
+    if mode.strip()
+]
+_WARMUP_SIZE = max(8, int(os.environ.get("AURORA_WARMUP_SIZE", "64")))
+
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+_inference = None
+_started_at: float | None = None
+_finished_at: float | None = None
+_error: str | None = None
+_steps: Dict[str, Dict[str, Any]] = {}
+
+
+def import_inference():
+    global _inference
+    if _inference is None:
+        from backend.app.services import inference
+        _inference = inference
+    return _inference
+
+
+def loaded_inference():
+    return _inference
+
+
+def _run_step(name: str, fn) -> None:
+    step = {"status": "running", "seconds": None}
+    with _lock:
+        _steps[name] = step
+    start = time.monotonic()
+    try:
+        fn()
+    except Exception:
+        step["status"] = "failed"
+        raise
+    else:
+        step["status"] = "done"
+    finally:
+        step["seconds"] = round(time.monotonic() - start, 3)
+
+
+def _dummy_image() -> Image.Image:
+    return Image.new("RGB", (_WARMUP_SIZE, _WARMUP_SIZE), (127, 127, 127))
+
+
+def _warm() -> None:
+    global _finished_at, _error
+    start = time.monotonic()
+    try:
+        _run_step("imports", import_inference)
+        for mode in _WARMUP_MODES:
+            _run_step(f"load:{mode}", lambda: _inference.preload_models(mode))
+            _run_step(f"inference:{mode}", lambda: _inference.run_pipeline(_dummy_image(), mode=mode))
+    except Exception as exc:
+        _error = f"{type(exc).__name__}: {exc}"
+        print(f"✗ Warm-up failed: {_error}")
+    else:
+        print(f"✓ Warm-up finished in {time.monotonic() - start:.2f}s ({', '.join(_WARMUP_MODES) or 'imports only'})")
+    finally:
+        _finished_at = time.time()
+
+
+def start_warmup() -> Optional[threading.Thread]:
+    global _thread, _started_at
+    with _lock:
+        if _thread is not None:
+            return _thread
+        if not _WARMUP_ENABLED:
+            return None
+        _started_at = time.time()
+        _thread = threading.Thread(target=_warm, name="aurora-warmup", daemon=True)
+        _thread.start()
+        return _thread
+
+
+def is_ready() -> bool:
+    if not _WARMUP_ENABLED:
+        return True
+    return _finished_at is not None and _error is None
+
+
+def readiness() -> Dict[str, Any]:
+    with _lock:
+        steps = {name: dict(step) for name, step in _steps.items()}
+    models = {
+        name: {
+            "loaded": info["loaded"],
+            "loadSeconds": info["loadSeconds"],
+            "approxBytes": info["approxBytes"],
+        }
+        for name, info in registry.stats()["models"].items()
+    }
+    return {
+        "ready": is_ready(),
+        "warmup": {
+            "enabled": _WARMUP_ENABLED,
+            "modes": _WARMUP_MODES,
+            "startedAt": _started_at,
+            "finishedAt": _finished_at,
+            "error": _error,
+            "steps": steps,
+        },
+        "models": models,
+    }
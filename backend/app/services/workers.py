@@ -0,0 +1,126 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+SEGMENTATION_LANE = "segmentation"
+UPSCALE_LANE = "upscale"
+GENERATION_LANE = "generation"
+
+
+class QueueFullError(RuntimeError):
+    def __init__(self, lane: str, depth: int) -> None:
+        super().__init__(f"The {lane} queue is full ({depth} requests waiting). Please try again shortly.")
+        self.lane = lane
+        self.depth = depth
+
+
+class _Lane:
+    def __init__(self, name: str, concurrency: int, max_queue: int) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix=f"aurora-{name}",
+        )
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits: deque = deque(maxlen=256)
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_waits)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "concurrency": self.concurrency,
+            "maxQueue": self.max_queue,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avgWaitSeconds": round(self.total_wait / self.completed, 3) if self.completed else 0.0,
+            "p95WaitSeconds": round(p95, 3),
+            "maxWaitSeconds": round(self.max_wait, 3),
+        }
+
+
+class InferencePool:
+    def __init__(self, concurrency: Dict[str, int], max_queue: int) -> None:
+        self._lock = threading.Lock()
+        self._lanes = {
+            name: _Lane(name, limit, max_queue) for name, limit in concurrency.items()
+        }
+
+    def _lane(self, name: str) -> _Lane:
+        try:
+            return self._lanes[name]
+        except KeyError:
+            raise ValueError(f"Unknown worker lane: {name}") from None
+
+    async def run(self, lane_name: str, fn: Callable, *args, **kwargs):
+        lane = self._lane(lane_name)
+        with self._lock:
+            if lane.queued + lane.running >= lane.concurrency + lane.max_queue:
+                lane.rejected += 1
+                raise QueueFullError(lane.name, lane.queued)
+            lane.queued += 1
+
+        submitted = time.monotonic()
+        context = contextvars.copy_context()
+
+        def job():
+            wait = time.monotonic() - submitted
+            with self._lock:
+                lane.queued -= 1
+                lane.running += 1
+                lane.total_wait += wait
+                lane.max_wait = max(lane.max_wait, wait)
+                lane.recent_waits.append(wait)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    lane.running -= 1
+                    lane.completed += 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(lane.executor, job)
+
+    def queue_depth(self, lane_name: str | None = None) -> int:
+        with self._lock:
+            if lane_name is not None:
+                return self._lane(lane_name).queued
+            return sum(lane.queued for lane in self._lanes.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: lane.stats() for name, lane in self._lanes.items()}
+
+    def shutdown(self) -> None:
+        for lane in self._lanes.values():
+            lane.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+inference_pool = InferencePool(
+    concurrency={
+        SEGMENTATION_LANE: _env_int("AURORA_CONCURRENCY_SEGMENTATION", 1),
+        UPSCALE_LANE: _env_int("AURORA_CONCURRENCY_UPSCALE", 1),
+        GENERATION_LANE: _env_int("AURORA_CONCURRENCY_GENERATION", 1),
+    },
+    max_queue=_env_int("AURORA_MAX_QUEUE", 8),
+)
@@ -1,29 +1,238 @@
+import os
+import threading
+
 import numpy as np
 from PIL import Image
 import cv2
 
 def postprocess_mask(mask_array: np.ndarray, threshold: float = 0.5, smooth_edges: bool = True) -> np.ndarray:
-    thresholded = np.where(mask_array >= threshold, mask_array, 0.0)
-    
+    if mask_array.dtype != np.uint8:
+        mask_array = np.clip(mask_array * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+    if threshold > 0:
+        cutoff = max(0, int(np.ceil(threshold * 255)) - 1)
+        _, mask_array = cv2.threshold(mask_array, cutoff, 255, cv2.THRESH_TOZERO)
+
     if smooth_edges:
-        mask_uint8 = (thresholded * 255).astype(np.uint8)
-        smoothed = cv2.GaussianBlur(mask_uint8, (5, 5), 1.0)
-        thresholded = smoothed.astype(np.float32) / 255.0
-    
-    return thresholded
-
-def replace_background(foreground_rgba: Image.Image, background_path: str) -> Image.Image:
-    background = Image.open(background_path).convert('RGB')
-    
-    background = background.resize(foreground_rgba.size, Image.LANCZOS)
-    
-    alpha = foreground_rgba.split()[3]
-    
-    fg_array = np.array(foreground_rgba)
-    bg_array = np.array(background)
-    alpha_array = np.array(alpha).astype(np.float32) / 255.0
-    
-    alpha_3d = alpha_array[:, :, np.newaxis]
-    composite = (fg_array[:, :, :3] * alpha_3d + bg_array * (1 - alpha_3d)).astype(np.uint8)
-    
-    return Image.fromarray(composite, mode='RGB')
\ No newline at end of file
+        mask_array = cv2.GaussianBlur(mask_array, (5, 5), 1.0)
+
+    return mask_array
+
+BACKGROUND_FIT_MODES = ("stretch", "cover", "contain")
+_RESAMPLE_FILTERS = {
+    "lanczos": Image.LANCZOS,
+    "bicubic": Image.BICUBIC,
+    "bilinear": Image.BILINEAR,
+}
+_COMPOSITE_CHUNK_ROWS = 64
+_GUIDED_CHUNK_ROWS = 256
+_scratch = threading.local()
+
+
+def _scratch_buffer(name: str, shape: tuple, dtype) -> np.ndarray:
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    buffer = buffers.get(name)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = buffers[name] = np.empty(shape, dtype=dtype)
+    return buffer
+
+
+def _resize(background: Image.Image, size: tuple, resample: str) -> np.ndarray:
+    if background.size == size:
+        return np.asarray(background)
+    if resample == "fast":
+        array = np.asarray(background)
+        shrinking = size[0] < background.size[0] and size[1] < background.size[1]
+        return cv2.resize(array, size, interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR)
+    if resample not in _RESAMPLE_FILTERS:
+        raise ValueError(f"Unknown resample mode: {resample}. Must be 'fast' or one of {', '.join(_RESAMPLE_FILTERS)}")
+    return np.asarray(background.resize(size, _RESAMPLE_FILTERS[resample]))
+
+
+def fit_background(
+    background: Image.Image,
+    size: tuple,
+    fit: str = "cover",
+    resample: str = "lanczos",
+    fill: tuple = (0, 0, 0),
+) -> np.ndarray:
+    width, height = size
+    bg_width, bg_height = background.size
+    background = background.convert("RGB")
+
+    if fit == "stretch":
+        return _resize(background, size, resample)
+
+    if fit == "cover":
+        scale = max(width / bg_width, height / bg_height)
+        crop_w = min(bg_width, max(1, round(width / scale)))
+        crop_h = min(bg_height, max(1, round(height / scale)))
+        left = (bg_width - crop_w) // 2
+        top = (bg_height - crop_h) // 2
+        cropped = background.crop((left, top, left + crop_w, top + crop_h))
+        return _resize(cropped, size, resample)
+
+    if fit == "contain":
+        scale = min(width / bg_width, height / bg_height)
+        inner = (max(1, round(bg_width * scale)), max(1, round(bg_height * scale)))
+        resized = _resize(background, inner, resample)
+        canvas = np.empty((height, width, 3), dtype=np.uint8)
+        canvas[:] = fill
+        left = (width - inner[0]) // 2
+        top = (height - inner[1]) // 2
+        canvas[top:top + inner[1], left:left + inner[0]] = resized
+        return canvas
+
+    raise ValueError(f"Unknown fit mode: {fit}. Must be one of {', '.join(BACKGROUND_FIT_MODES)}")
+
+
+def composite_over(foreground_rgba: np.ndarray, background_rgb: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    height, width = foreground_rgba.shape[:2]
+    if background_rgb.shape[:2] != (height, width):
+        raise ValueError("Foreground and background must have the same size")
+    if out is None:
+        out = np.empty((height, width, 3), dtype=np.uint8)
+    foreground_rgba = np.ascontiguousarray(foreground_rgba)
+    background_rgb = np.ascontiguousarray(background_rgb)
+
+    chunk = min(_COMPOSITE_CHUNK_ROWS, height)
+    rgb = _scratch_buffer("rgb", (chunk, width, 3), np.uint8)
+    alpha = _scratch_buffer("alpha", (chunk, width), np.uint8)
+    alpha3 = _scratch_buffer("alpha3", (chunk, width, 3), np.uint8)
+    weighted = _scratch_buffer("weighted", (chunk, width, 3), np.uint8)
+
+    for top in range(0, height, chunk):
+        rows = min(chunk, height - top)
+        fg = foreground_rgba[top:top + rows]
+        dst = out[top:top + rows]
+
+        cv2.cvtColor(fg, cv2.COLOR_RGBA2RGB, dst=rgb[:rows])
+        cv2.extractChannel(fg, 3, dst=alpha[:rows])
+        cv2.cvtColor(alpha[:rows], cv2.COLOR_GRAY2RGB, dst=alpha3[:rows])
+        cv2.multiply(rgb[:rows], alpha3[:rows], dst=weighted[:rows], scale=1 / 255)
+        cv2.bitwise_not(alpha3[:rows], dst=alpha3[:rows])
+        cv2.multiply(background_rgb[top:top + rows], alpha3[:rows], dst=dst, scale=1 / 255)
+        cv2.add(dst, weighted[:rows], dst=dst)
+
+    return out
+
+
+def replace_background(
+    foreground_rgba: Image.Image,
+    background: Image.Image | str,
+    fit: str | None = None,
+    resample: str | None = None,
+) -> Image.Image:
+    if not isinstance(background, Image.Image):
+        background = Image.open(background)
+    fit = fit or os.environ.get("AURORA_BG_FIT", "cover")
+    resample = resample or os.environ.get("AURORA_BG_RESAMPLE", "lanczos")
+
+    foreground_rgba = foreground_rgba.convert("RGBA")
+    bg_array = fit_background(background, foreground_rgba.size, fit=fit, resample=resample)
+    composite = composite_over(np.asarray(foreground_rgba), bg_array)
+
+    return Image.fromarray(composite)
+
+
+def guided_filter(guide: np.ndarray, src: np.ndarray, radius: int, eps: float = 1e-3) -> np.ndarray:
+    ksize = (2 * radius + 1, 2 * radius + 1)
+    guide = guide.astype(np.float32, copy=False)
+    src = src.astype(np.float32, copy=False)
+
+    mean_i = cv2.boxFilter(guide, -1, ksize)
+    mean_p = cv2.boxFilter(src, -1, ksize)
+    cov_ip = cv2.boxFilter(guide * src, -1, ksize) - mean_i * mean_p
+    var_i = cv2.boxFilter(guide * guide, -1, ksize) - mean_i * mean_i
+
+    a = cov_ip / (var_i + eps)
+    b = mean_p - a * mean_i
+    return cv2.boxFilter(a, -1, ksize) * guide + cv2.boxFilter(b, -1, ksize)
+
+
+def _linear_coords(size: int, small: int) -> np.ndarray:
+    coords = (np.arange(size, dtype=np.float32) + 0.5) * (small / size) - 0.5
+    return np.clip(coords, 0, small - 1)
+
+
+def fast_guided_filter(
+    guide: np.ndarray,
+    src: np.ndarray,
+    radius: int,
+    eps: float = 1e-3,
+    subsample: int = 4,
+) -> np.ndarray:
+    height, width = guide.shape[:2]
+    subsample = max(1, min(subsample, radius))
+    small = (max(1, width // subsample), max(1, height // subsample))
+
+    guide_small = cv2.resize(guide, small, interpolation=cv2.INTER_AREA).astype(np.float32) / 255.0
+    shrinking = src.shape[1] > small[0] and src.shape[0] > small[1]
+    src_small = cv2.resize(
+        src, small, interpolation=cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+    ).astype(np.float32) / 255.0
+
+    ksize = (2 * max(1, radius // subsample) + 1,) * 2
+    mean_i = cv2.boxFilter(guide_small, -1, ksize)
+    mean_p = cv2.boxFilter(src_small, -1, ksize)
+    cov_ip = cv2.boxFilter(guide_small * src_small, -1, ksize) - mean_i * mean_p
+    var_i = cv2.boxFilter(guide_small * guide_small, -1, ksize) - mean_i * mean_i
+    a = cov_ip / (var_i + eps)
+    b = mean_p - a * mean_i
+    mean_a = cv2.boxFilter(a, -1, ksize)
+    mean_b = cv2.boxFilter(b, -1, ksize)
+
+    # Upsample the coefficients and apply them a band of rows at a time so the
+    # full-resolution float maps never exist at once (8 bytes per output pixel).
+    out = np.empty((height, width), dtype=np.uint8)
+    chunk = min(_GUIDED_CHUNK_ROWS, height)
+    map_x = np.empty((chunk, width), dtype=np.float32)
+    map_x[:] = _linear_coords(width, small[0])
+    map_y = np.empty((chunk, width), dtype=np.float32)
+    rows_y = _linear_coords(height, small[1])
+    for top in range(0, height, chunk):
+        rows = min(chunk, height - top)
+        map_y[:rows] = rows_y[top:top + rows, None]
+        band_a = cv2.remap(mean_a, map_x[:rows], map_y[:rows], cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        band_b = cv2.remap(mean_b, map_x[:rows], map_y[:rows], cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        cv2.multiply(band_a, guide[top:top + rows], dst=band_a, dtype=cv2.CV_32F)
+        cv2.addWeighted(band_a, 1.0, band_b, 255.0, 0.0, dst=out[top:top + rows], dtype=cv2.CV_8U)
+    return out
+
+
+def refine_mask(
+    mask: np.ndarray,
+    image_rgb: np.ndarray,
+    threshold: float = 0.5,
+    smooth_edges: bool = True,
+    radius: int | None = None,
+    eps: float = 1e-3,
+    subsample: int = 4,
+) -> np.ndarray:
+    height, width = image_rgb.shape[:2]
+    mask = postprocess_mask(mask, threshold=threshold, smooth_edges=smooth_edges)
+
+    if radius is None:
+        radius = max(4, round(max(height, width) / 256))
+    if radius <= 0:
+        if mask.shape[:2] != (height, width):
+            mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_LINEAR)
+        return mask
+
+    guide = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
+    return fast_guided_filter(guide, mask, radius, eps=eps, subsample=subsample)
+
+
+def upscale_alpha(alpha: np.ndarray, guide_rgb: np.ndarray, mode: str = "guided") -> np.ndarray:
+    height, width = guide_rgb.shape[:2]
+    if mode == "resize":
+        return cv2.resize(alpha, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    # Solve the guided filter at the alpha's own resolution and only apply the
+    # upsampled coefficients at full size, in bands, so memory stays near one
+    # byte per output pixel instead of the ~40 of a full-resolution float filter.
+    scale = max(1, round(height / alpha.shape[0]))
+    guide = cv2.cvtColor(guide_rgb, cv2.COLOR_RGB2GRAY)
+    return fast_guided_filter(guide, alpha, radius=2 * scale, subsample=scale)
@@ -22,4 +22,3 @@ def cleanup_paths(*paths: Path) -> None:
                 path.unlink()
         except (OSError, FileNotFoundError):
             pass
-
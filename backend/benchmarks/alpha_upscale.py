@@ -0,0 +1,70 @@
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from backend.app.services import inference as aurora_inference
+
+
+def _edge_band(alpha: np.ndarray, width: int) -> np.ndarray:
+    soft = (alpha > 0) & (alpha < 255)
+    hard = cv2.Canny(alpha, 64, 192) > 0
+    kernel = np.ones((2 * width + 1, 2 * width + 1), dtype=np.uint8)
+    return cv2.dilate((soft | hard).astype(np.uint8), kernel) > 0
+
+
+def _compare(reference: np.ndarray, candidate: np.ndarray, band: np.ndarray) -> dict:
+    ref = reference.astype(np.float32) / 255.0
+    cand = candidate.astype(np.float32) / 255.0
+    ref_fg = ref >= 0.5
+    cand_fg = cand >= 0.5
+    union = np.logical_or(ref_fg, cand_fg).sum()
+    return {
+        "edge_mae": round(float(np.abs(ref - cand)[band].mean()) if band.any() else 0.0, 5),
+        "global_mae": round(float(np.abs(ref - cand).mean()), 5),
+        "iou": round(float(np.logical_and(ref_fg, cand_fg).sum() / union) if union else 1.0, 5),
+    }
+
+
+def run(image_path: str, scale: int, repeats: int) -> dict:
+    image = Image.open(image_path).convert("RGBA")
+    aurora_inference.enhance_image(image.resize((64, 64)), scale=scale, alpha_mode="model")
+
+    outputs = {}
+    timings = {}
+    for mode in ("model", "resize", "guided"):
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = aurora_inference.enhance_image(image, scale=scale, alpha_mode=mode)
+            samples.append(time.perf_counter() - start)
+        outputs[mode] = np.array(result.split()[3])
+        timings[mode] = round(min(samples), 3)
+
+    reference = outputs["model"]
+    band = _edge_band(reference, width=scale)
+    report = {"image": image_path, "size": list(image.size), "scale": scale, "modes": {}}
+    for mode, alpha in outputs.items():
+        entry = {"seconds": timings[mode], "speedup": round(timings["model"] / timings[mode], 2)}
+        entry.update(_compare(reference, alpha, band))
+        report["modes"][mode] = entry
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare RGBA alpha upscaling strategies against the two-pass model baseline"
+    )
+    parser.add_argument("image", help="Path to an RGBA image (e.g. a background removal result)")
+    parser.add_argument("--scale", type=int, default=4, choices=(2, 4))
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.image, args.scale, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import json
+import time
+
+import numpy as np
+from PIL import Image
+
+from backend.app.utils.aurora_utils import composite_over, fit_background
+
+SIZES = {"4k": (3840, 2160), "8k": (7680, 4320)}
+
+
+def _legacy_replace_background(foreground_rgba: Image.Image, background: Image.Image) -> Image.Image:
+    background = background.resize(foreground_rgba.size, Image.LANCZOS)
+    alpha = foreground_rgba.split()[3]
+
+    fg_array = np.array(foreground_rgba)
+    bg_array = np.array(background)
+    alpha_array = np.array(alpha).astype(np.float32) / 255.0
+
+    alpha_3d = alpha_array[:, :, np.newaxis]
+    composite = (fg_array[:, :, :3] * alpha_3d + bg_array * (1 - alpha_3d)).astype(np.uint8)
+    return Image.fromarray(composite)
+
+
+def _synthetic_inputs(size: tuple, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    width, height = size
+    fg = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    yy, xx = np.mgrid[0:height, 0:width]
+    radius = ((xx - width / 2) ** 2 + (yy - height / 2) ** 2) ** 0.5
+    fg[:, :, 3] = np.clip((min(width, height) * 0.4 - radius) * 4, 0, 255).astype(np.uint8)
+    background = Image.fromarray(rng.integers(0, 256, size=(1080, 1920, 3), dtype=np.uint8))
+    return Image.fromarray(fg), background
+
+
+def _best_of(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(min(samples), 4)
+
+
+def run(sizes: list, repeats: int) -> dict:
+    report = {}
+    for name in sizes:
+        size = SIZES[name]
+        foreground, background = _synthetic_inputs(size)
+        fg_array = np.asarray(foreground)
+        bg_lanczos = fit_background(background, size, fit="stretch", resample="lanczos")
+        out = np.empty((size[1], size[0], 3), dtype=np.uint8)
+
+        entry = {
+            "legacy_total": _best_of(lambda: _legacy_replace_background(foreground, background), repeats),
+            "legacy_composite_only": _best_of(
+                lambda: (fg_array[:, :, :3] * (fg_array[:, :, 3:4] / 255.0)
+                         + bg_lanczos * (1 - fg_array[:, :, 3:4] / 255.0)).astype(np.uint8),
+                repeats,
+            ),
+            "fast_composite_only": _best_of(lambda: composite_over(fg_array, bg_lanczos, out=out), repeats),
+        }
+        for fit in ("stretch", "cover"):
+            for resample in ("lanczos", "fast"):
+                entry[f"{fit}_{resample}_total"] = _best_of(
+                    lambda: composite_over(fg_array, fit_background(background, size, fit=fit, resample=resample), out=out),
+                    repeats,
+                )
+        entry["composite_speedup"] = round(entry["legacy_composite_only"] / entry["fast_composite_only"], 2)
+        entry["total_speedup_fast_cover"] = round(entry["legacy_total"] / entry["cover_fast_total"], 2)
+        report[name] = entry
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark background compositing at 4K and 8K")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.sizes, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import copy
+import json
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from backend.app.services import inference as aurora_inference
+from backend.app.services.precision import FP32, PRECISION_MODES, prepare_model, resolve_precision
+
+TARGETS = ("birefnet", "upscaler_2x", "upscaler_4x")
+
+
+def _psnr(reference: np.ndarray, candidate: np.ndarray) -> float:
+    mse = np.mean((reference.astype(np.float64) - candidate.astype(np.float64)) ** 2)
+    return round(float(10 * np.log10(255.0 ** 2 / mse)), 2) if mse > 0 else float("inf")
+
+
+def _iou(reference: np.ndarray, candidate: np.ndarray) -> float:
+    ref_fg = reference >= 0.5
+    cand_fg = candidate >= 0.5
+    union = np.logical_or(ref_fg, cand_fg).sum()
+    return round(float(np.logical_and(ref_fg, cand_fg).sum() / union) if union else 1.0, 5)
+
+
+def _best_of(fn, repeats: int):
+    samples = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, round(min(samples), 3)
+
+
+def _variants(base, device: torch.device, modes):
+    for mode in modes:
+        if resolve_precision(mode, base, device) != mode:
+            yield mode, None
+            continue
+        yield mode, prepare_model(copy.deepcopy(base), mode)
+
+
+def bench_segmentation(image: Image.Image, modes, repeats: int) -> dict:
+    device = aurora_inference._DEVICE
+    base = aurora_inference._load_birefnet()
+    batch = aurora_inference._TRANSFORM(image.convert("RGB")).unsqueeze(0)
+
+    report = {}
+    reference = None
+    for mode, model in _variants(base, device, modes):
+        if model is None:
+            report[mode] = {"skipped": "not supported on this machine"}
+            continue
+        aurora_inference._segment(model, batch, device)
+        pred, seconds = _best_of(lambda: aurora_inference._segment(model, batch, device), repeats)
+        mask = pred[0, 0].numpy()
+        if reference is None:
+            reference, baseline = mask, seconds
+        report[mode] = {
+            "seconds": seconds,
+            "speedup": round(baseline / seconds, 2),
+            "iou": _iou(reference, mask),
+            "mae": round(float(np.abs(reference - mask).mean()), 5),
+        }
+    return report
+
+
+def bench_upscaler(image: Image.Image, scale: int, modes, repeats: int, tile_size: int) -> dict:
+    device = torch.device("cpu")
+    base = aurora_inference._load_upscaler(scale)
+    rgb = np.array(image.convert("RGB"))
+
+    def run(model):
+        return aurora_inference._upscale_array(model, rgb, scale, tile_size, aurora_inference._UPSCALE_TILE_OVERLAP)
+
+    report = {}
+    reference = None
+    for mode, model in _variants(base, device, modes):
+        if model is None:
+            report[mode] = {"skipped": "not supported on this machine"}
+            continue
+        output, seconds = _best_of(lambda: run(model), repeats)
+        if reference is None:
+            reference, baseline = output, seconds
+        report[mode] = {
+            "seconds": seconds,
+            "speedup": round(baseline / seconds, 2),
+            "psnr": _psnr(reference, output),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare reduced-precision inference modes against the float32 baseline"
+    )
+    parser.add_argument("image", help="Path to an input image")
+    parser.add_argument("--models", default=",".join(TARGETS), help="Comma-separated subset of: " + ", ".join(TARGETS))
+    parser.add_argument("--modes", default=",".join(PRECISION_MODES), help="Comma-separated precision modes")
+    parser.add_argument("--crop", type=int, default=256, help="Centre crop used for the upscalers (0 = full image)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    modes = [FP32] + [mode for mode in args.modes.split(",") if mode and mode != FP32]
+    image = Image.open(args.image)
+    upscale_input = image
+    if args.crop > 0:
+        left = max(0, (image.width - args.crop) // 2)
+        top = max(0, (image.height - args.crop) // 2)
+        upscale_input = image.crop((left, top, left + min(args.crop, image.width), top + min(args.crop, image.height)))
+
+    report = {"image": args.image, "size": list(image.size), "models": {}}
+    for target in args.models.split(","):
+        if target == "birefnet":
+            report["models"][target] = bench_segmentation(image, modes, args.repeats)
+        elif target in ("upscaler_2x", "upscaler_4x"):
+            scale = int(target[-2])
+            report["models"][target] = bench_upscaler(
+                upscale_input, scale, modes, args.repeats, aurora_inference._UPSCALE_TILE_SIZE
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import json
+import time
+
+import numpy as np
+from PIL import Image
+
+from backend.app.services import inference as aurora_inference
+
+BASELINE = (1024, "stretch")
+
+
+def _mask(model, device, image: Image.Image, resolution: int, fit: str):
+    tensor, (left, top, right, bottom) = aurora_inference._segmentation_input(image, resolution, fit)
+    start = time.perf_counter()
+    pred = aurora_inference._segment(model, tensor.unsqueeze(0), device)
+    seconds = time.perf_counter() - start
+    pred = pred[0, 0, top:bottom, left:right].numpy()
+    mask = Image.fromarray((pred * 255).astype(np.uint8)).resize(image.size, Image.BILINEAR)
+    return np.asarray(mask, dtype=np.float32) / 255.0, seconds
+
+
+def _iou(reference: np.ndarray, candidate: np.ndarray) -> float:
+    ref_fg = reference >= 0.5
+    cand_fg = candidate >= 0.5
+    union = np.logical_or(ref_fg, cand_fg).sum()
+    return float(np.logical_and(ref_fg, cand_fg).sum() / union) if union else 1.0
+
+
+def run(paths: list[str], resolutions: list[int], fits: list[str], repeats: int) -> dict:
+    model, device, _ = aurora_inference.get_model(None)
+    settings = [(resolution, fit) for resolution in resolutions for fit in fits]
+    if BASELINE not in settings:
+        settings.insert(0, BASELINE)
+
+    totals = {setting: {"seconds": [], "iou": [], "mae": []} for setting in settings}
+    images = []
+    for path in paths:
+        image = Image.open(path).convert("RGB")
+        aurora_inference._segment(model, aurora_inference._segmentation_input(image, 512, "stretch")[0].unsqueeze(0), device)
+        reference, _ = _mask(model, device, image, *BASELINE)
+        per_image = {}
+        for setting in settings:
+            samples = [_mask(model, device, image, *setting) for _ in range(repeats)]
+            mask = samples[0][0]
+            seconds = min(sample[1] for sample in samples)
+            iou = _iou(reference, mask)
+            mae = float(np.abs(reference - mask).mean())
+            totals[setting]["seconds"].append(seconds)
+            totals[setting]["iou"].append(iou)
+            totals[setting]["mae"].append(mae)
+            per_image[f"{setting[0]}/{setting[1]}"] = {
+                "seconds": round(seconds, 3),
+                "iou": round(iou, 5),
+                "mae": round(mae, 5),
+            }
+        images.append({
+            "image": path,
+            "size": list(image.size),
+            "auto": aurora_inference.segmentation_resolution(image.size, "auto"),
+            "settings": per_image,
+        })
+
+    baseline_seconds = np.mean(totals[BASELINE]["seconds"])
+    summary = {
+        f"{resolution}/{fit}": {
+            "meanSeconds": round(float(np.mean(values["seconds"])), 3),
+            "speedup": round(float(baseline_seconds / np.mean(values["seconds"])), 2),
+            "meanIou": round(float(np.mean(values["iou"])), 5),
+            "minIou": round(float(np.min(values["iou"])), 5),
+            "meanMae": round(float(np.mean(values["mae"])), 5),
+        }
+        for (resolution, fit), values in totals.items()
+    }
+    return {"baseline": f"{BASELINE[0]}/{BASELINE[1]}", "summary": summary, "images": images}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Segmentation latency vs mask IoU at each BiRefNet input resolution"
+    )
+    parser.add_argument("images", nargs="+", help="Input images")
+    parser.add_argument("--resolutions", default="512,768,1024")
+    parser.add_argument("--fits", default="stretch,pad")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    resolutions = [int(value) for value in args.resolutions.split(",") if value]
+    fits = [value for value in args.fits.split(",") if value]
+    print(json.dumps(run(args.images, resolutions, fits, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+CASES = {
+    "remove_background": {"mode": "remove_background"},
+    "replace_background": {"mode": "remove_background", "bg_type": "upload"},
+    "prompt_background": {"mode": "remove_background", "bg_type": "generate", "bg_prompt": "sunlit beach"},
+    "enhance_2x": {"mode": "enhance_2x"},
+    "enhance_4x": {"mode": "enhance_4x"},
+    "advanced_2x": {"mode": "advanced_2x"},
+    "advanced_4x": {"mode": "advanced_4x"},
+}
+
+DEFAULT_SIZES = (256, 512, 1024)
+
+
+def _configure_env(args) -> None:
+    os.environ["AURORA_WARMUP"] = "0"
+    if not args.cache:
+        scratch = tempfile.mkdtemp(prefix="aurora-bench-")
+        os.environ["AURORA_RESULT_CACHE_MB"] = "0"
+        os.environ["AURORA_MASK_CACHE_MB"] = "0"
+        os.environ["AURORA_BG_CACHE_MB"] = "0"
+        os.environ["AURORA_BG_CACHE_DISK_MB"] = "0"
+        os.environ["AURORA_BG_CACHE_DIR"] = scratch
+        os.environ.pop("AURORA_RESULT_CACHE_DIR", None)
+        os.environ.pop("AURORA_MASK_CACHE_DIR", None)
+
+
+def _install_stub_models() -> None:
+    import torch
+
+    from backend.app.services import inference
+    from backend.app.services.model_registry import registry
+
+    class StubSegmenter(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.body = torch.nn.Sequential(
+                torch.nn.Conv2d(3, 8, 3, padding=1),
+                torch.nn.ReLU(),
+                torch.nn.Conv2d(8, 8, 3, padding=1),
+                torch.nn.ReLU(),
+                torch.nn.Conv2d(8, 1, 3, padding=1),
+            )
+
+        def forward(self, x):
+            return [self.body(x)]
+
+    class StubUpscaler(torch.nn.Module):
+        def __init__(self, scale: int) -> None:
+            super().__init__()
+            self.body = torch.nn.Sequential(
+                torch.nn.Conv2d(3, 16, 3, padding=1),
+                torch.nn.ReLU(),
+                torch.nn.Conv2d(16, 3 * scale * scale, 3, padding=1),
+                torch.nn.PixelShuffle(scale),
+            )
+
+        def forward(self, x):
+            return self.body(x).sigmoid()
+
+    class StubDiffusionPipeline:
+        def __init__(self) -> None:
+            self.unet = torch.nn.Conv2d(4, 4, 3, padding=1)
+
+        def __call__(self, prompt: str, num_inference_steps: int = 4, guidance_scale: float = 1.0, generator=None):
+            latents = torch.randn(1, 4, 64, 64, generator=generator)
+            with torch.no_grad():
+                for _ in range(num_inference_steps):
+                    latents = self.unet(latents)
+            pixels = torch.nn.functional.interpolate(latents[:, :3], size=(512, 512), mode="bilinear")
+            array = (pixels[0].sigmoid().permute(1, 2, 0).numpy() * 255).astype(np.uint8)
+            return type("StubOutput", (), {"images": [Image.fromarray(array)]})()
+
+    def build(module: torch.nn.Module, name: str, device):
+        torch.manual_seed(0)
+        return inference._prepare(module.eval().to(device), name, device)
+
+    registry.register(inference.BIREFNET_MODEL, lambda: build(StubSegmenter(), inference.BIREFNET_MODEL, inference._DEVICE))
+    for scale in (2, 4):
+        name = inference.upscaler_model_name(scale)
+        registry.register(name, lambda scale=scale, name=name: build(StubUpscaler(scale), name, torch.device("cpu")))
+    registry.register("lcm", StubDiffusionPipeline)
+
+
+def synthetic_image(size: int, seed: int, rgba: bool = False) -> bytes:
+    rng = np.random.default_rng(seed)
+    width, height = size, max(1, size * 3 // 4)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([x / width, y / height, 1 - x / width], axis=-1) * 255
+    noise = rng.normal(0, 12, (height, width, 3))
+    image = Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8))
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(3):
+        cx, cy = rng.uniform(0.3, 0.7) * width, rng.uniform(0.3, 0.7) * height
+        rx, ry = rng.uniform(0.1, 0.25) * width, rng.uniform(0.1, 0.3) * height
+        color = tuple(int(value) for value in rng.integers(0, 255, 3))
+        draw.ellipse((cx - rx, cy - ry, cx + rx, cy + ry), fill=color)
+
+    if rgba:
+        mask = Image.new("L", image.size, 0)
+        ImageDraw.Draw(mask).ellipse((width * 0.2, height * 0.15, width * 0.8, height * 0.95), fill=255)
+        image.putalpha(mask.filter(ImageFilter.GaussianBlur(max(1, size // 128))))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _PeakRss:
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.start = self.peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __enter__(self) -> "_PeakRss":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def _percentile(values: list, q: float) -> float:
+    return round(float(np.percentile(values, q)), 4)
+
+
+def run_case(client, name: str, size: int, args) -> dict:
+    spec = CASES[name]
+    rgba = name == "prompt_background"
+    images = [synthetic_image(size, seed, rgba=rgba) for seed in range(args.repeats + args.warmup)]
+    background = synthetic_image(size, 10_000)
+
+    def request(index: int) -> float:
+        form = {**spec, "format": args.format}
+        if spec.get("bg_type") == "generate":
+            form["bg_seed"] = str(index)
+        files = {"image": (f"bench_{index}.png", images[index], "image/png")}
+        if spec.get("bg_type") == "upload":
+            files["background"] = ("background.png", background, "image/png")
+        start = time.perf_counter()
+        response = client.post("/process", files=files, data=form, headers={"Accept": "image/*"})
+        seconds = time.perf_counter() - start
+        if response.status_code != 200 or not response.headers.get("content-type", "").startswith("image/"):
+            raise RuntimeError(f"{name}@{size}: HTTP {response.status_code}: {response.text[:200]}")
+        return seconds
+
+    for index in range(args.warmup):
+        request(index)
+
+    with _PeakRss() as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(request, range(args.warmup, args.warmup + args.repeats)))
+        wall = time.perf_counter() - start
+
+    width, height = size, max(1, size * 3 // 4)
+    return {
+        "case": name,
+        "mode": spec["mode"],
+        "size": [width, height],
+        "requests": len(latencies),
+        "concurrency": args.concurrency,
+        "latency": {
+            "mean": round(float(np.mean(latencies)), 4),
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "min": round(min(latencies), 4),
+            "max": round(max(latencies), 4),
+        },
+        "throughput": {
+            "imagesPerSecond": round(len(latencies) / wall, 3),
+            "megapixelsPerSecond": round(len(latencies) * width * height / 1e6 / wall, 3),
+        },
+        "memory": {
+            "peakRssBytes": rss.peak,
+            "peakRssDeltaBytes": max(0, rss.peak - rss.start),
+        },
+    }
+
+
+def _environment(args) -> dict:
+    import torch
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cpuCount": os.cpu_count(),
+        "torchThreads": torch.get_num_threads(),
+        "models": "real" if args.real_models else "stub",
+        "cache": args.cache,
+        "format": args.format,
+        "repeats": args.repeats,
+        "warmup": args.warmup,
+        "env": {key: value for key, value in sorted(os.environ.items()) if key.startswith("AURORA_")},
+    }
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    previous = {(case["case"], tuple(case["size"])): case for case in baseline.get("cases", [])}
+    comparison = {}
+    for case in report["cases"]:
+        before = previous.get((case["case"], tuple(case["size"])))
+        if before is None:
+            continue
+        key = f"{case['case']}@{case['size'][0]}x{case['size'][1]}"
+        comparison[key] = {
+            "p50Ratio": round(case["latency"]["p50"] / before["latency"]["p50"], 3),
+            "p90Ratio": round(case["latency"]["p90"] / before["latency"]["p90"], 3),
+            "throughputRatio": round(
+                case["throughput"]["imagesPerSecond"] / before["throughput"]["imagesPerSecond"], 3
+            ),
+            "peakRssDeltaBytes": case["memory"]["peakRssDeltaBytes"] - before["memory"]["peakRssDeltaBytes"],
+        }
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end /process latency, throughput and peak memory for every processing mode"
+    )
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated subset of: " + ", ".join(CASES))
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="Longest image sides")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--format", default="png", help="Output format requested from /process")
+    parser.add_argument("--cache", action="store_true", help="Keep the result, mask and background caches enabled")
+    parser.add_argument("--real-models", action="store_true", help="Use the real models instead of offline stubs")
+    parser.add_argument("--output", "-o", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    cases = [name for name in args.cases.split(",") if name]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+
+    _configure_env(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        if not args.real_models:
+            _install_stub_models()
+
+        from fastapi.testclient import TestClient
+
+        from backend.app.main import app
+
+        report = {"environment": _environment(args), "cases": []}
+        with TestClient(app) as client:
+            for name in cases:
+                for size in sizes:
+                    result = run_case(client, name, size, args)
+                    report["cases"].append(result)
+                    print(
+                        f"✓ {name}@{size}: p50 {result['latency']['p50'] * 1000:.1f} ms, "
+                        f"{result['throughput']['imagesPerSecond']:.2f} img/s"
+                    )
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
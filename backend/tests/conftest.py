@@ -0,0 +1,5 @@
+import os
+
+# Keep the app from loading the real models in a background thread when a
+# test starts it.
+os.environ.setdefault("AURORA_WARMUP", "0")
@@ -0,0 +1,67 @@
+import asyncio
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.app import main
+from backend.app.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _png(size=(32, 32)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 40, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("path", ["/process", "/jobs"])
+def test_oversized_seg_quality_is_rejected(client, path):
+    response = client.post(
+        path,
+        files={"image": ("a.png", _png(), "image/png")},
+        data={"mode": "remove_background", "seg_quality": "100000"},
+        headers={"Accept": "image/png"},
+    )
+    assert response.status_code == 422
+
+
+def test_coalesced_waiters_encode_their_own_copy(monkeypatch):
+    shared = Image.fromarray(np.random.default_rng(0).integers(0, 256, (512, 512, 3), dtype=np.uint8))
+
+    async def execute(*args, **kwargs):
+        await asyncio.sleep(0.2)
+        return shared, None, {"provider": "stub"}
+
+    monkeypatch.setattr(main, "_execute", execute)
+
+    async def scenario():
+        outputs = await asyncio.gather(
+            main._produce(_png(), "upscale", "none", None, "", "", "", output_format="webp", compression="lossless"),
+            main._produce(_png(), "upscale", "none", None, "", "", "", output_format="webp", compression="10"),
+        )
+
+        async def collect(output):
+            return b"".join([chunk async for chunk in output.chunks()])
+
+        return outputs, await asyncio.gather(*(collect(output) for output in outputs))
+
+    (lossless, lossy), (lossless_bytes, lossy_bytes) = asyncio.run(scenario())
+    assert lossy.headers.get("X-Aurora-Coalesced") == "1"
+    assert lossless.image is not lossy.image
+    assert np.array_equal(np.asarray(Image.open(io.BytesIO(lossless_bytes))), np.asarray(shared))
+    assert len(lossy_bytes) < len(lossless_bytes) // 4
+
+
+def test_generated_background_is_not_shared():
+    generated = Image.new("RGB", (16, 16), (10, 20, 30))
+    result = main._composite_generated(Image.new("RGB", (16, 16)), generated)
+    assert result is not generated
+    assert result.tobytes() == generated.tobytes()
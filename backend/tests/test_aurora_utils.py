@@ -0,0 +1,41 @@
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from backend.app.utils.aurora_utils import upscale_alpha
+
+
+def _disc(size: int) -> np.ndarray:
+    alpha = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(alpha, (size // 2, size // 2), size // 3, 255, -1)
+    return alpha
+
+
+def test_guided_alpha_upscale_follows_the_guide():
+    alpha = _disc(100)
+    guide = cv2.cvtColor(_disc(400), cv2.COLOR_GRAY2RGB)
+
+    upscaled = upscale_alpha(alpha, guide, mode="guided")
+
+    assert upscaled.shape == (400, 400) and upscaled.dtype == np.uint8
+    assert upscaled[200, 200] == 255 and upscaled[5, 5] == 0
+    edge = np.abs(upscaled.astype(int) - _disc(400).astype(int))
+    assert edge.mean() < 2
+
+
+def test_guided_alpha_upscale_memory_is_bounded():
+    scale, side = 4, 3000
+    alpha = _disc(side // scale)
+    guide = np.zeros((side, side, 3), dtype=np.uint8)
+
+    tracemalloc.start()
+    try:
+        upscale_alpha(alpha, guide, mode="guided")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # The output itself is one byte per pixel; a full-resolution float32
+    # guided filter needs ~40.
+    assert peak < 8 * side * side
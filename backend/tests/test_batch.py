@@ -0,0 +1,26 @@
+from PIL import Image
+
+from backend.app.services import batch, inference
+
+
+def _cutout(image, mode="remove_background", background=None):
+    result = image.convert("RGBA")
+    result.putpixel((0, 0), (0, 0, 0, 0))
+    return result
+
+
+def test_resume_skips_results_written_under_a_fallback_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(inference, "preload_models", lambda mode: None)
+    monkeypatch.setattr(inference, "run_pipeline", _cutout)
+    source, output = tmp_path / "in", tmp_path / "out"
+    source.mkdir()
+    for index in range(3):
+        Image.new("RGB", (16, 16), (index * 80, 0, 0)).save(source / f"{index}.png")
+    inputs, root = batch.collect_inputs(str(source))
+
+    first = batch.run_batch(inputs, root, str(output), output_format="jpeg")
+    assert first["processed"] == 3
+    assert sorted(path.name for path in output.iterdir()) == ["0.png", "1.png", "2.png"]
+
+    second = batch.run_batch(inputs, root, str(output), output_format="jpeg")
+    assert second["processed"] == 0 and second["skipped"] == 3
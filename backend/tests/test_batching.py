@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from backend.app.services.batching import MicroBatcher
+
+
+def _submit_concurrently(batcher: MicroBatcher, items: list) -> list:
+    outcomes = [None] * len(items)
+
+    def submit(index: int) -> None:
+        try:
+            outcomes[index] = batcher.submit(items[index])
+        except Exception as exc:
+            outcomes[index] = exc
+
+    threads = [threading.Thread(target=submit, args=(index,)) for index in range(len(items))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+        assert not thread.is_alive(), "submit() never returned"
+    return outcomes
+
+
+def test_results_are_matched_to_their_items():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_batch=4, max_wait_ms=50)
+    assert _submit_concurrently(batcher, [1, 2, 3, 4]) == [2, 4, 6, 8]
+
+
+def test_short_batch_fails_every_item_instead_of_hanging():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch=4, max_wait_ms=200, name="short")
+    outcomes = _submit_concurrently(batcher, [1, 2, 3])
+    assert batcher.batches == 0
+    for outcome in outcomes:
+        assert isinstance(outcome, RuntimeError)
+        with pytest.raises(RuntimeError, match="results"):
+            raise outcome
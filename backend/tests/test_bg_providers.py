@@ -0,0 +1,45 @@
+import pytest
+from PIL import Image
+
+from backend.app.services import bg_providers
+from backend.app.services.cache import ByteCache
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    calls = {"openvino": 0, "lcm": 0}
+    state = {"openvino_works": False}
+
+    def openvino(prompt, seed=None):
+        calls["openvino"] += 1
+        if not state["openvino_works"]:
+            raise RuntimeError("device unavailable")
+        return Image.new("RGB", (8, 8), (0, 0, 255))
+
+    def lcm(prompt, seed=None):
+        calls["lcm"] += 1
+        return Image.new("RGB", (8, 8), (0, 255, 0))
+
+    monkeypatch.setattr(bg_providers, "_BG_CACHE", ByteCache("background", max_bytes=1 << 20))
+    monkeypatch.setattr(bg_providers, "_openvino_importable", lambda: True)
+    monkeypatch.setattr(bg_providers._openvino_provider, "generate", openvino)
+    monkeypatch.setattr(bg_providers._lcm_provider, "generate", lcm)
+    return calls, state
+
+
+def test_fallback_is_cached_under_the_provider_that_produced_it(providers):
+    calls, state = providers
+
+    _, info = bg_providers.generate_background("a beach", provider_pref="openvino", seed=1)
+    assert info["provider"] == "lcm"
+
+    _, info = bg_providers.generate_background("a beach", provider_pref="lcm", seed=1)
+    assert info["provider"] == "lcm" and info["cached"]
+
+    state["openvino_works"] = True
+    _, info = bg_providers.generate_background("a beach", provider_pref="openvino", seed=1)
+    assert info["provider"] == "openvino" and not info["cached"]
+
+    _, info = bg_providers.generate_background("a beach", provider_pref="openvino", seed=1)
+    assert info["provider"] == "openvino" and info["cached"]
+    assert calls == {"openvino": 2, "lcm": 1}
@@ -0,0 +1,43 @@
+import asyncio
+import io
+
+import numpy as np
+from PIL import Image
+
+from backend.app.services import encoding
+from backend.app.services.encoding import encode_image, stream_encoded
+
+
+def _noise(size: int = 256) -> Image.Image:
+    rng = np.random.default_rng(0)
+    return Image.fromarray(rng.integers(0, 255, (size, size, 3), dtype=np.uint8))
+
+
+def test_streamed_bytes_match_a_direct_encode():
+    image = _noise()
+    expected = io.BytesIO()
+    encode_image(image, "png", "fast", expected)
+
+    async def collect():
+        return b"".join([chunk async for chunk in stream_encoded(image, "png", "fast", chunk_bytes=4096)])
+
+    assert asyncio.run(collect()) == expected.getvalue()
+
+
+def test_stalled_streams_leave_the_default_executor_free(monkeypatch):
+    monkeypatch.setattr(encoding, "_STREAM_STALL_SECONDS", 0.2)
+    # Large enough that each encoder fills its chunk queue and blocks.
+    image = _noise(1024)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        # More paused streams than the default executor has threads.
+        streams = [stream_encoded(image, "png", "fast", chunk_bytes=1024) for _ in range(8)]
+        await asyncio.wait_for(asyncio.gather(*(stream.__anext__() for stream in streams)), timeout=20)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(None, lambda: "ran"), timeout=5)
+        finally:
+            for stream in streams:
+                await stream.aclose()
+
+    assert asyncio.run(scenario()) == "ran"
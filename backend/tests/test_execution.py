@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+import torch
+
+from backend.app.services import execution
+
+
+class _ListSegmenter(torch.nn.Module):
+    def __init__(self) -> None:
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 1, 3, padding=1)
+
+    def forward(self, x):
+        return [self.conv(x)]
+
+
+_RUNTIMES = {execution.ONNX: "onnxruntime", execution.OPENVINO: "openvino"}
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(execution, "ARTIFACT_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.parametrize("backend", [execution.TORCHSCRIPT, execution.COMPILE, execution.ONNX, execution.OPENVINO])
+def test_batched_list_output_matches_eager(backend):
+    if backend in _RUNTIMES:
+        pytest.importorskip(_RUNTIMES[backend])
+    torch.manual_seed(0)
+    module = _ListSegmenter().eval()
+    batch = torch.rand(3, 3, 32, 32)
+    compiled = execution.CompiledModel(module, "segmenter", backend)
+
+    with torch.no_grad():
+        expected = module(batch)[-1]
+        output = compiled(batch)
+
+    assert compiled.fallbacks == 0
+    assert isinstance(output, list) and len(output) == 1
+    assert output[-1].shape == (3, 1, 32, 32)
+    assert torch.allclose(output[-1], expected, atol=1e-4)
+
+
+def test_exported_outputs_keep_the_module_container(artifact_dir):
+    module = _ListSegmenter().eval()
+    example = torch.rand(3, 3, 32, 32)
+    container = execution._output_container(module, example, artifact_dir / "segmenter")
+    values = [np.zeros((3, 1, 32, 32), dtype=np.float32)]
+
+    outputs = execution._outputs(values, container)
+    assert isinstance(outputs, list) and outputs[-1].shape == (3, 1, 32, 32)
+
+    # Later processes read the recorded structure instead of re-running the module.
+    assert execution._output_container(None, example, artifact_dir / "segmenter") is list
+    assert execution._outputs(values, None).shape == (3, 1, 32, 32)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from backend.app.services import inference
+from backend.app.services.model_registry import registry
+
+
+class _NearestUpscaler(torch.nn.Module):
+    def __init__(self, scale: int) -> None:
+        super().__init__()
+        self.body = torch.nn.Upsample(scale_factor=scale, mode="nearest")
+
+    def forward(self, x):
+        return self.body(x)
+
+
+@pytest.fixture
+def stub_upscaler():
+    name = inference.upscaler_model_name(2)
+    registry.evict(name)
+    registry.register(name, lambda: _NearestUpscaler(2).eval())
+    yield
+    registry.evict(name)
+
+
+def test_mask_alpha_mode_uses_the_refined_prediction(stub_upscaler):
+    image = Image.new("RGB", (64, 64), (40, 40, 40))
+    image.paste((220, 220, 220), (16, 16, 48, 48))
+    cutout = image.copy()
+    cutout.putalpha(255)
+
+    # A raw prediction with background noise below the refinement threshold.
+    raw = np.full((32, 32), 60, dtype=np.uint8)
+    raw[8:24, 8:24] = 255
+    mask = Image.fromarray(raw)
+
+    upscaled = inference.enhance_image(cutout, scale=2, alpha_mode="mask", alpha_mask=mask, tile_size=0)
+    alpha = np.asarray(upscaled)[:, :, 3]
+
+    assert alpha.shape == (128, 128)
+    assert alpha[4, 4] == 0
+    assert alpha[64, 64] == 255
+
+
+@pytest.mark.parametrize("quality,expected", [("fast", 512), ("best", 1024), ("700", 704), (2048, 2048)])
+def test_segmentation_resolution_accepts_presets_and_sizes(quality, expected):
+    assert inference.segmentation_resolution((4000, 3000), quality) == expected
+
+
+@pytest.mark.parametrize("quality", ["100000", "65536", "2049", "16", "huge"])
+def test_segmentation_resolution_rejects_out_of_range(quality):
+    with pytest.raises(ValueError):
+        inference.segmentation_resolution((64, 64), quality)
@@ -0,0 +1,54 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from backend.app.services import profiling
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    yield tmp_path
+    profiling._active = None
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_abandoned_session_hands_over_tracemalloc(monkeypatch):
+    first = profiling.start("first")
+    assert first is not None and tracemalloc.is_tracing()
+    assert profiling.start("busy") is None
+
+    monkeypatch.setattr(profiling, "_ABANDON_SECONDS", 0)
+    second = profiling.start("second")
+    assert second is not None and first.finished
+    assert second._owns_tracemalloc and not first._owns_tracemalloc
+
+    profiling.finish(second)
+    assert not tracemalloc.is_tracing()
+    assert profiling.start("third") is not None
+
+
+def test_disconnect_before_the_body_finishes_the_profile():
+    from starlette.requests import ClientDisconnect
+
+    from backend.app.main import _Output, _OutputResponse
+
+    session = profiling.start("/process remove_background")
+    output = _Output({}, None, "png", "fast", payload=b"\x89PNG", mode="remove_background")
+    output.profile = session
+    response = _OutputResponse(output, {})
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("connection reset")
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    with pytest.raises(ClientDisconnect):
+        asyncio.run(response(scope, receive, send))
+
+    assert session.finished and not tracemalloc.is_tracing()
+    assert profiling.summary_path(session.id) is not None
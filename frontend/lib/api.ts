@@ -21,41 +21,21 @@ export interface ProcessImageOptions {
   onNotice?: (message: string) => void
 }
 
-function dataURLtoBlob(dataURL: string): Blob {
-  const arr = dataURL.split(',')
-  const mime = arr[0].match(/:(.*?);/)?.[1] || 'image/png'
-  const bstr = atob(arr[1])
-  let n = bstr.length
-  const u8arr = new Uint8Array(n)
-  while (n--) {
-    u8arr[n] = bstr.charCodeAt(n)
-  }
-  return new Blob([u8arr], { type: mime })
-}
-
-function base64ToBlob(base64: string, mimeType: string = 'image/png'): Blob {
-  const byteCharacters = atob(base64)
-  const byteNumbers = new Array(byteCharacters.length)
-  for (let i = 0; i < byteCharacters.length; i++) {
-    byteNumbers[i] = byteCharacters.charCodeAt(i)
+async function fetchResultFromHtml(response: Response, signal: AbortSignal): Promise<Blob> {
+  let resultUrl = response.headers.get('x-aurora-result-url')
+  if (!resultUrl) {
+    const html = await response.text()
+    resultUrl = html.match(/<img[^>]+src=["'](\/results\/[^"']+)["']/i)?.[1] ?? null
   }
-  const byteArray = new Uint8Array(byteNumbers)
-  return new Blob([byteArray], { type: mimeType })
-}
-
-function extractImageFromHtml(html: string): Blob {
-  const dataUrlMatch = html.match(/data:image\/png;base64,([^"'\s<>]+)/i)
-  if (dataUrlMatch) {
-    const base64Data = dataUrlMatch[1]
-    return base64ToBlob(base64Data, 'image/png')
+  if (!resultUrl) {
+    throw new Error('Could not extract image from server response')
   }
 
-  const imgSrcMatch = html.match(/<img[^>]+src=["'](data:image\/[^"']+)["']/i)
-  if (imgSrcMatch && imgSrcMatch[1].startsWith('data:')) {
-    return dataURLtoBlob(imgSrcMatch[1])
+  const result = await fetch(`${API_BASE_URL}${resultUrl}`, { signal })
+  if (!result.ok) {
+    throw new Error('Processed image has expired. Please try again.')
   }
-
-  throw new Error('Could not extract image from server response')
+  return await result.blob()
 }
 
 async function extractErrorMessage(response: Response): Promise<string> {
@@ -139,12 +119,11 @@ export async function processImage(
       throw new Error(errorMessage)
     }
 
-    if (contentType.includes('image/png')) {
+    if (contentType.startsWith('image/')) {
       return await response.blob()
     }
 
-    const html = await response.text()
-    return extractImageFromHtml(html)
+    return await fetchResultFromHtml(response, controller.signal)
   } catch (error) {
     clearTimeout(timeoutId)
 
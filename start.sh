@@ -3,15 +3,35 @@ echo "===== Application Startup at $(date) ====="
 
 cd /app
 
-echo "Starting FastAPI backend on port 8000..."
-uvicorn backend.app.main:app --host 0.0.0.0 --port 8000 &
+if [ "${AURORA_WORKERS:-1}" -gt 1 ]; then
+    echo "Starting FastAPI backend on port 8000 with ${AURORA_WORKERS} workers..."
+    python3 -m backend.app.serve --host 0.0.0.0 --port 8000 &
+else
+    echo "Starting FastAPI backend on port 8000..."
+    uvicorn backend.app.main:app --host 0.0.0.0 --port 8000 &
+fi
 BACKEND_PID=$!
 
-echo "Waiting for backend to start..."
-sleep 5
-
-echo "Testing backend connectivity..."
-python3 -c "import urllib.request; urllib.request.urlopen('http://127.0.0.1:8000/health').read()" && echo "Backend health check passed" || echo "Backend health check failed"
+echo "Waiting for backend models to warm up..."
+READY_TIMEOUT=${AURORA_READY_TIMEOUT:-600}
+READY=0
+for ((i = 0; i < READY_TIMEOUT; i++)); do
+    if ! kill -0 $BACKEND_PID 2>/dev/null; then
+        echo "Backend exited before becoming ready"
+        break
+    fi
+    if python3 -c "import urllib.request; urllib.request.urlopen('http://127.0.0.1:8000/ready', timeout=2).read()" 2>/dev/null; then
+        READY=1
+        break
+    fi
+    sleep 1
+done
+
+if [ $READY -eq 1 ]; then
+    echo "Backend ready after ${i}s"
+else
+    echo "Backend not ready after ${i}s; see http://127.0.0.1:8000/ready"
+fi
 
 echo "Starting Next.js frontend on port 7860..."
 cd frontend